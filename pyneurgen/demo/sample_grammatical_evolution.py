@@ -22,16 +22,102 @@
 This sample program shows a simple use of grammatical evolution.  The
 evolutionary process drives the fitness values towards zero.
 
+The fitness evaluations are spread across all of the processor cores by
+shipping each genotype to a worker process, since each fitness function can be
+computed independently of the rest of the population.
+
 """
+from __future__ import print_function
+
+
+import random
 
+import numpy as np
+from multiprocessing import Pool, cpu_count
+
+from pyneurgen.genotypes import _timer
 from pyneurgen.grammatical_evolution import GrammaticalEvolution
 from pyneurgen.fitness import FitnessElites, FitnessTournament
 from pyneurgen.fitness import ReplacementTournament, MAX, MIN, CENTER
 
+#   Seed the generator that drives genotype creation, mutation and
+#       crossover so that runs are reproducible for profiling.
+random.seed(0)
+
+#   The sample grid and the target curve are identical for every individual
+#       ever evaluated, so they are computed once here and read by the
+#       generated programs through the genotype.
+sample_points = np.linspace(0.0, 1.0, 100, endpoint=False)
+target_curve = sample_points ** 3
+
+
+def _eval_one(gene):
+    """
+    This function computes the fitness function for one genotype.  It runs
+    within a worker process and returns the genotype, since the gene can be
+    modified as a byproduct of the mapping process.
+
+    """
+
+    gene.sample_points = sample_points
+    gene.target_curve = target_curve
+    gene.starttime = _timer()
+    gene.compute_fitness()
+    del gene.sample_points
+    del gene.target_curve
+    return gene
+
+
+#   Fitness values per binary gene.  Mapping a gene to a program and running
+#       it is deterministic, so identical genes regenerated by crossover and
+#       mutation in later generations can skip the evaluation.
+_fitness_cache = {}
+
+
+def run_parallel(ges, pool, starting_generation=0):
+    """
+    This function mirrors GrammaticalEvolution.run, but farms the fitness
+    evaluations out to a pool of worker processes, one genotype per task.
+    Genes that have already been evaluated in a prior generation are looked
+    up in a cache instead of being recomputed.  Selection, crossover,
+    mutation and replacement are unchanged.
+
+    """
+
+    ges._generation = starting_generation
+    while True:
+        keys = [gene.binary_gene for gene in ges.population]
+        pending = [position for position in range(len(ges.population))
+                        if keys[position] not in _fitness_cache]
+
+        results = pool.map(_eval_one,
+                    [ges.population[position] for position in pending])
+        for position, gene in zip(pending, results):
+            ges.population[position] = gene
+            _fitness_cache[keys[position]] = (gene.get_fitness(),
+                                            gene.local_bnf['program'])
+
+        for position, gene in enumerate(ges.population):
+            fitness, program = _fitness_cache[keys[position]]
+            gene._fitness = fitness
+            gene.local_bnf['program'] = program
+            ges.fitness_list[gene.member_no][0] = fitness
+
+        if ges._maintain_history:
+            ges._record_history()
+
+        if ges._continue_processing():
+            ges._perform_endcycle()
+            ges._generation += 1
+        else:
+            break
+
+    return ges.fitness_list.best_member()
+
 
 bnf =   """
 <expr>              ::= <expr> <biop> <expr> | <uop> <expr> | <real> |
-                        math.log(abs(<expr>)) | <pow> | math.sin(<expr> )|
+                        np.log(np.abs(<expr>)) | <pow> | np.sin(<expr> )|
                         value | (<expr>)
 <biop>              ::= + | - | * | /
 <uop>               ::= + | -
@@ -42,12 +128,17 @@ bnf =   """
 <int-const>         ::= <int-const> | 1 | 2 | 3 | 4 | 5 | 6 |
                         7 | 8 | 9 | 0
 <S>                 ::=
-import math
-total = 0.0
-for i in xrange(100):
-    value = float(i) / float(100)
-    total += abs(<expr> - pow(value, 3))
-fitness = total
+import numpy as np
+try:
+    from numba import njit
+except ImportError:
+    def njit(func):
+        return func
+@njit
+def _expr(value):
+    return <expr>
+value = self.sample_points
+fitness = float(np.abs(_expr(value) - self.target_curve).sum())
 self.set_bnf_variable('<fitness>', fitness)
         """
 
@@ -83,9 +174,12 @@ ges.set_replacement_selections(
 
 ges.set_maintain_history(True)
 ges.create_genotypes()
-print ges.run()
-print ges.fitness_list.sorted()
-print
-print
+pool = Pool(processes=cpu_count())
+print(run_parallel(ges, pool))
+pool.close()
+pool.join()
+print(ges.fitness_list.sorted())
+print()
+print()
 gene = ges.population[ges.fitness_list.best_member()]
-print gene.get_program()
+print(gene.get_program())
@@ -25,16 +25,142 @@ maximum number of nodes, and then specifies node types, connections, and
 starting weights.
 
 """
+from __future__ import print_function
+
 import math
 import random
-import matplotlib
-from pylab import plot, legend, subplot, grid, xlabel, ylabel, show, title
+import numpy as np
+from multiprocessing import Pool, cpu_count
 
+from pyneurgen.genotypes import _timer
 from pyneurgen.grammatical_evolution import GrammaticalEvolution
 from pyneurgen.fitness import FitnessElites, FitnessTournament
 from pyneurgen.fitness import ReplacementTournament
 from pyneurgen.neuralnet import NeuralNet
 
+#   Seed both generators so that runs are reproducible for profiling.
+#       The stdlib generator drives mutation and crossover inside the
+#       GrammaticalEvolution class; the RandomState handles the bulk draws.
+random.seed(0)
+rng = np.random.RandomState(0)
+
+
+def _eval_one(gene):
+    """
+    This function computes the fitness function for one genotype.  It runs
+    within a worker process and returns the genotype, since the gene can be
+    modified as a byproduct of the mapping process.  For this sample, each
+    fitness function trains a complete neural network, so the gains from
+    parallel evaluation are substantial.
+
+    The dataset is not shipped with the gene.  The worker processes are
+    forked after all_inputs and all_targets are built, so each worker
+    already holds the arrays and only the gene itself crosses the pipe.
+
+    """
+
+    gene.all_inputs = all_inputs
+    gene.all_targets = all_targets
+    gene.starttime = _timer()
+    gene.compute_fitness()
+    del gene.all_inputs
+    del gene.all_targets
+    return gene
+
+
+#   Fitness values per binary gene.  Mapping a gene to a network and training
+#       it is deterministic given fixed inputs, so identical genes regenerated
+#       by crossover and mutation in later generations can skip the training.
+_fitness_cache = {}
+
+
+def run_parallel(ges, pool, starting_generation=0):
+    """
+    This function mirrors GrammaticalEvolution.run, but farms the fitness
+    evaluations out to a pool of worker processes, one genotype per task.
+    Genes that have already been evaluated in a prior generation are looked
+    up in a cache instead of being retrained.  Selection, crossover,
+    mutation and replacement are unchanged.
+
+    """
+
+    ges._generation = starting_generation
+    while True:
+        keys = [gene.binary_gene for gene in ges.population]
+        pending = [position for position in range(len(ges.population))
+                        if keys[position] not in _fitness_cache]
+
+        results = pool.map(_eval_one,
+                    [ges.population[position] for position in pending])
+        for position, gene in zip(pending, results):
+            ges.population[position] = gene
+            _fitness_cache[keys[position]] = (gene.get_fitness(),
+                                            gene.local_bnf['program'])
+
+        for position, gene in enumerate(ges.population):
+            fitness, program = _fitness_cache[keys[position]]
+            gene._fitness = fitness
+            gene.local_bnf['program'] = program
+            ges.fitness_list[gene.member_no][0] = fitness
+
+        if ges._maintain_history:
+            ges._record_history()
+
+        if ges._continue_processing():
+            ges._perform_endcycle()
+            ges._generation += 1
+        else:
+            break
+
+    return ges.fitness_list.best_member()
+
+
+def plot_results(population, ges, test_positions, all_targets1, allactuals):
+    """
+    This function charts the results of the run.  The plotting imports are
+    deferred until here so that the evolutionary run does not pay the
+    matplotlib startup cost.
+
+    """
+
+    from matplotlib.pyplot import figure
+    from pylab import legend, subplot, grid, xlabel, ylabel, show, title
+
+    fig = figure()
+    ax1 = subplot(211)
+    ax1.plot([i[1] for i in population])
+    ax1.set_title("Population")
+    grid(True)
+    a = [i for i in ax1.get_yticklabels()]
+    for i in a: i.set_fontsize(9)
+    a = [i for i in ax1.get_xticklabels()]
+    for i in a: i.set_fontsize(9)
+
+    ax2 = subplot(2, 1, 2)
+    ax2.plot(test_positions, all_targets1, 'bo', label='targets')
+    ax2.plot(test_positions, allactuals, 'ro', label='actuals')
+    grid(True)
+    legend(loc='lower left', numpoints=1)
+    a = [i for i in ax2.get_yticklabels()]
+    for i in a: i.set_fontsize(9)
+    a = [i for i in ax2.get_xticklabels()]
+    for i in a: i.set_fontsize(9)
+
+    show()
+
+    fig = figure()
+    ax1 = subplot(111)
+    ax1.plot(ges.get_fitness_history())
+    xlabel('generations')
+    ylabel('fitness (mse)')
+    grid(True)
+    title("Best Fitness Values by Generation")
+    a = [i for i in ax1.get_yticklabels()]
+    for i in a: i.set_fontsize(9)
+    a = [i for i in ax1.get_xticklabels()]
+    for i in a: i.set_fontsize(9)
+
+    show()
 
 
 bnf =   """
@@ -70,12 +196,16 @@ net.init_layers(len(self.all_inputs[0]),
 net.layers[1].set_activation_type('<node_type>')
 net.output_layer.set_activation_type('<node_type>')
 
-#   Use the genotype to get starting weights
-for layer in net.layers[1:]:
-    for node in layer.nodes:
-        for conn in node.input_connections:
-            #   every time it is asked, another starting weight is given
-            conn.set_weight(self.runtime_resolve('<starting_weight>', 'float'))
+#   Use the genotype to get starting weights.  The connections are
+#   flattened once and the weights batch-resolved in a single pass --
+#   every time it is asked, another starting weight is given
+conns = [conn for layer in net.layers[1:]
+            for node in layer.nodes
+                for conn in node.input_connections]
+weights = [self.runtime_resolve('<starting_weight>', 'float')
+            for conn in conns]
+for conn, weight in zip(conns, weights):
+    conn.set_weight(weight)
 
 # Note the injection of data from the genotype
 # In a real project, the genotype might pull the data from elsewhere.
@@ -103,7 +233,7 @@ if epochs > 0:
 #   Use validation for generating the fitness value
 mse = net.validate(show_sample_interval=0)
 
-print "mse", mse
+print("mse %s" % (mse))
 modelname = self.runtime_resolve('<model_name>', 'str')
 
 net.save(modelname)
@@ -154,41 +284,35 @@ ges.create_genotypes()
 #   all samples are drawn from this population
 pop_len = 200
 factor = 1.0 / float(pop_len)
-population = [[i, math.sin(float(i) * factor * 10.0) + \
-                random.gauss(factor, .2)]
-                    for i in range(pop_len)]
-
-all_inputs = []
-all_targets = []
-
-
-def population_gen(population):
-    """
-    This function shuffles the values of the population and yields the
-    items in a random fashion.
-
-    """
-
-    pop_sort = [item for item in population]
-    random.shuffle(pop_sort)
-
-    for item in pop_sort:
-        yield item
-
-#   Build the inputs
-for position, target in population_gen(population):
-    all_inputs.append([float(position) / float(pop_len), random.random()])
-    all_targets.append([target])
-
-for g in ges.population:
-    g.all_inputs = all_inputs
-    g.all_targets = all_targets
-
-print ges.run()
-print "Final Fitness list sorted best to worst:"
-print ges.fitness_list.sorted()
-print
-print
+idx = np.arange(pop_len, dtype=np.float64)
+population = np.column_stack(
+    [idx, np.sin(idx * factor * 10.0) +
+        rng.normal(factor, .2, pop_len)]).tolist()
+
+#   Build the inputs in one pass with vectorized numpy calls
+pop_sort = population[:]
+rng.shuffle(pop_sort)
+
+positions = np.array([item[0] for item in pop_sort], dtype=np.float64)
+targets = np.array([item[1] for item in pop_sort])
+
+all_inputs = np.column_stack(
+    [positions / float(pop_len), rng.random_sample(pop_len)]).tolist()
+all_targets = targets[:, None].tolist()
+
+#   Each individual trains an independent network on identical data, so the
+#       population is evaluated in parallel, one genotype per core.  The same
+#       independence would allow the per-individual weight matrices to be
+#       stacked and trained as one batched matrix multiply on a GPU, should a
+#       GPU-capable backend become available to this package.
+pool = Pool(processes=cpu_count())
+print(run_parallel(ges, pool))
+pool.close()
+pool.join()
+print("Final Fitness list sorted best to worst:")
+print(ges.fitness_list.sorted())
+print()
+print()
 g = ges.population[ges.fitness_list.best_member()]
 program = g.local_bnf['program']
 
@@ -205,51 +329,20 @@ test_start_point = int(pop_len * .8) + 1
 net.set_test_range(test_start_point, pop_len - 1)
 mse = net.test()
 
-print "The selected model has the following characteristics"
-print "Activation Type:", net.layers[1].nodes[1].get_activation_type()
-print "Hidden Nodes:", len(net.layers[1].nodes), ' + 1 bias node'
-print "Learn Rate:", net.get_learnrate()
-print "Epochs:", net.get_epochs()
+print("The selected model has the following characteristics")
+print("Activation Type:", net.layers[1].nodes[1].get_activation_type())
+print("Hidden Nodes:", len(net.layers[1].nodes), ' + 1 bias node')
+print("Learn Rate:", net.get_learnrate())
+print("Epochs:", net.get_epochs())
 
-test_positions = [item[0][0] * pop_len for item in net.get_test_data()]
+test_positions = np.asarray(
+    [item[0] for item in net.get_test_data()])[:, 0] * pop_len
 
-all_targets1 = [item[0][0] for item in net.test_targets_activations]
-allactuals = [item[1][0] for item in net.test_targets_activations]
+#   One pass over the targets/activations; slice out the two columns
+targets_activations = np.asarray(net.test_targets_activations)
+all_targets1 = targets_activations[:, 0, 0]
+allactuals = targets_activations[:, 1, 0]
 
 #   This is quick and dirty, but it will show the results
-fig = figure()
-ax1 = subplot(211)
-ax1.plot([i[1] for i in population])
-ax1.set_title("Population")
-grid(True)
-a = [i for i in ax1.get_yticklabels()]
-for i in a: i.set_fontsize(9)
-a = [i for i in ax1.get_xticklabels()]
-for i in a: i.set_fontsize(9)
-
-ax2 = subplot(2, 1, 2)
-ax2.plot(test_positions, all_targets1, 'bo', label='targets')
-ax2.plot(test_positions, allactuals, 'ro', label='actuals')
-grid(True)
-legend(loc='lower left', numpoints=1)
-a = [i for i in ax2.get_yticklabels()]
-for i in a: i.set_fontsize(9)
-a = [i for i in ax2.get_xticklabels()]
-for i in a: i.set_fontsize(9)
-
-show()
-
-fig = figure()
-ax1 = subplot(111)
-ax1.plot(ges.get_fitness_history())
-xlabel('generations')
-ylabel('fitness (mse)')
-grid(True)
-title("Best Fitness Values by Generation")
-a = [i for i in ax1.get_yticklabels()]
-for i in a: i.set_fontsize(9)
-a = [i for i in ax1.get_xticklabels()]
-for i in a: i.set_fontsize(9)
-
-show()
+plot_results(population, ges, test_positions, all_targets1, allactuals)
 
@@ -27,51 +27,80 @@ There are two inputs, one of which is random.  The neural network will need to
 learn to ignore that input.  The target values are a modified sinusoidal.
 
 """
+from __future__ import print_function
+
 
 import random
 import math
 
-import matplotlib
-from pylab import plot, legend, subplot, grid, xlabel, ylabel, show, title
+import numpy as np
 
 from pyneurgen.neuralnet import NeuralNet
 from pyneurgen.nodes import BiasNode, Connection
 
-#   all samples are drawn from this population
-pop_len = 200
-factor = 1.0 / float(pop_len)
-population = [[i, math.sin(float(i) * factor * 10.0) + \
-                random.gauss(float(i) * factor, .2)]
-                    for i in range(pop_len)]
-
-all_inputs = []
-all_targets = []
 
-def population_gen(population):
+def plot_results(population, net, test_positions, all_targets1, allactuals):
     """
-    This function shuffles the values of the population and yields the
-    items in a random fashion.
+    This function charts the results of the run.  The plotting imports are
+    deferred until here so that the training run does not pay the
+    matplotlib startup cost.
 
     """
 
-    pop_sort = [item for item in population]
-    random.shuffle(pop_sort)
+    from pylab import plot, legend, subplot, grid, xlabel, ylabel, show, title
+
+    subplot(3, 1, 1)
+    plot([i[1] for i in population])
+    title("Population")
+    grid(True)
+
+    subplot(3, 1, 2)
+    plot(test_positions, all_targets1, 'bo', label='targets')
+    plot(test_positions, allactuals, 'ro', label='actuals')
+    grid(True)
+    legend(loc='lower left', numpoints=1)
+    title("Test Target Points vs Actual Points")
+
+    subplot(3, 1, 3)
+    plot(range(1, len(net.accum_mse) + 1, 1), net.accum_mse)
+    xlabel('epochs')
+    ylabel('mean squared error')
+    grid(True)
+    title("Mean Squared Error by Epoch")
+
+    show()
+
+#   Seed both generators so that runs are reproducible for profiling.
+#       The stdlib generator drives the network weight randomization; the
+#       RandomState handles the bulk draws.
+random.seed(0)
+rng = np.random.RandomState(0)
+
+#   all samples are drawn from this population
+pop_len = 200
+factor = 1.0 / float(pop_len)
+idx = np.arange(pop_len, dtype=np.float64)
+population = np.column_stack(
+    [idx, np.sin(idx * factor * 10.0) +
+        rng.normal(idx * factor, .2)]).tolist()
+
+#   Build the inputs in one pass with vectorized numpy calls
+pop_sort = population[:]
+rng.shuffle(pop_sort)
 
-    for item in pop_sort:
-        yield item
+positions = np.array([item[0] for item in pop_sort], dtype=np.float64)
+targets = np.array([item[1] for item in pop_sort])
 
-#   Build the inputs
-for position, target in population_gen(population):
-    pos = float(position)
-    all_inputs.append([random.random(), pos * factor])
-    all_targets.append([target])
+all_inputs = np.column_stack(
+    [rng.random_sample(pop_len), positions * factor]).tolist()
+all_targets = targets[:, None].tolist()
 
-print "input statistics"
-print "  random:", min([item[0] for item in all_inputs]), \
-                            max([item[0] for item in all_inputs])
-print "  useful:", min([item[1] for item in all_inputs]), \
-                            max([item[1] for item in all_inputs])
-print "target statistics:", min(all_targets), max(all_targets)
+print("input statistics")
+print("  random:", min([item[0] for item in all_inputs]),
+                            max([item[0] for item in all_inputs]))
+print("  useful:", min([item[1] for item in all_inputs]),
+                            max([item[1] for item in all_inputs]))
+print("target statistics:", min(all_targets), max(all_targets))
 
 net = NeuralNet()
 net.init_layers(2, [10], 1)
@@ -100,32 +129,16 @@ net.learn(epochs=125, show_epoch_results=True,
     random_testing=False)
 
 mse = net.test()
-print "test mse = ", mse
+print("test mse = ", mse)
 
-test_positions = [item[0][1] * 1000.0 for item in net.get_test_data()]
+test_positions = np.asarray(
+    [item[0] for item in net.get_test_data()])[:, 1] * 1000.0
 
-all_targets1 = [item[0][0] for item in net.test_targets_activations]
-allactuals = [item[1][0] for item in net.test_targets_activations]
+#   One pass over the targets/activations; slice out the two columns
+targets_activations = np.asarray(net.test_targets_activations)
+all_targets1 = targets_activations[:, 0, 0]
+allactuals = targets_activations[:, 1, 0]
 
 #   This is quick and dirty, but it will show the results
-subplot(3, 1, 1)
-plot([i[1] for i in population])
-title("Population")
-grid(True)
-
-subplot(3, 1, 2)
-plot(test_positions, all_targets1, 'bo', label='targets')
-plot(test_positions, allactuals, 'ro', label='actuals')
-grid(True)
-legend(loc='lower left', numpoints=1)
-title("Test Target Points vs Actual Points")
-
-subplot(3, 1, 3)
-plot(range(1, len(net.accum_mse) + 1, 1), net.accum_mse)
-xlabel('epochs')
-ylabel('mean squared error')
-grid(True)
-title("Mean Squared Error by Epoch")
-
-show()
+plot_results(population, net, test_positions, all_targets1, allactuals)
 
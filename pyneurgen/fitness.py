@@ -26,6 +26,14 @@ This module implements the fitness components for grammatical evolution.
 from random import random, randint
 import math
 
+import numpy as np
+
+try:
+    xrange
+except NameError:
+    #   Python 3
+    xrange = range
+
 MAX = 'max'
 MIN = 'min'
 CENTER = 'center'
@@ -107,6 +115,19 @@ class FitnessList(list):
 
         return self._target_value
 
+    def fast_copy(self):
+        """
+        This function returns a copy of the fitness list with its own
+        [fitness value, member no] pairs.  The pairs are small and uniform,
+        so they are rebuilt directly, which is far faster than the
+        reflective walk that deepcopy would perform.
+
+        """
+
+        flist = FitnessList(self._fitness_type, self._target_value)
+        flist.extend([pair[:] for pair in self])
+        return flist
+
     def min_value(self):
         """
         This function returns the minimum value in the list.
@@ -329,20 +350,14 @@ class Selection(object):
             raise ValueError(
                 "The scaled list received does not total 1.0: %s" % (
                     sum(scale_list)))
-        cumu = [0.0]
-        length = len(scale_list)
-        for i in xrange(length):
-            cumu.append(scale_list[i] + cumu[-1])
 
-        #   Rewrite for binary search sometime
-        for i in xrange(length):
-            rand_val = random()
-            position = 0
-            while position < length:
-                if cumu[position + 1] > rand_val:
-                    yield position
-                    break
-                position += 1
+        length = len(scale_list)
+        cumu = np.cumsum(scale_list)
+        positions = np.searchsorted(cumu, np.random.random(length),
+                        side='right')
+        for position in positions:
+            if position < length:
+                yield int(position)
 
     def _make_sort_list(self):
         """
@@ -405,25 +420,23 @@ class Tournament(Selection):
         The select function provides all the members based upon the class
         algorithm.
 
+        All of the tournaments are drawn and decided at once:  one random
+        draw of entrant positions, one gather of their fitness values, and
+        one argmin or argmax along the tournament axis, rather than building
+        a small fitness list per tournament.
+
         """
         population_size = len(self._selection_list)
-        position = 0
-        while position < population_size:
-
-            choice = 0
-
-            #   Grabs members until reaching the tournament size
-            tourn_list = FitnessList(self._minmax)
-            while choice < self._tournament_size:
-                rand_position = randint(0, population_size - 1)
-
-                #   Lookup the fitness value
-                tourn_list.append([self._selection_list[rand_position],
-                                   rand_position])
-                choice += 1
-            yield tourn_list.best_member()
-            del tourn_list
-            position += 1
+        values = np.asarray(self._selection_list, dtype=np.float64)
+        draws = np.random.randint(0, population_size,
+                    size=(population_size, self._tournament_size))
+        entrants = values[draws]
+        if self._minmax == MIN:
+            winners = entrants.argmin(axis=1)
+        else:
+            winners = entrants.argmax(axis=1)
+        for position in xrange(population_size):
+            yield int(draws[position, winners[position]])
 
 
 class Fitness(Selection):
@@ -712,11 +725,12 @@ class FitnessElites(Fitness):
         """
 
         self._scale_list()
-        sort_list = self._make_sort_list()
-        sort_list.sort()
-        elites = int(round(self._rate * float(len(sort_list))))
-        for item in sort_list[:elites]:
-            yield item[1]
+        values = np.asarray(self._selection_list, dtype=np.float64)
+        elites = int(round(self._rate * float(values.size)))
+        #   A stable sort keeps the tie break on member number that sorting
+        #   [value, member] pairs used to provide.
+        for member_no in values.argsort(kind='stable')[:elites]:
+            yield int(member_no)
 
 
 class FitnessLinearRanking(Fitness):
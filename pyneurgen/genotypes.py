@@ -22,16 +22,23 @@
 This module implements genotypes for grammatical evolution.
 
 """
-from datetime import datetime
 import logging
 import random
 import re
 import traceback
 
-from pyneurgen.utilities import base10tobase2, base2tobase10
+try:
+    from time import monotonic as _timer
+except ImportError:
+    #   Python 2 has no monotonic clock in the standard library
+    from time import time as _timer
+
+import numpy as np
 
 STOPLIST = ['runtime_resolve', 'set_bnf_variable']
+_STOP_RE = re.compile('|'.join([re.escape(item) for item in STOPLIST]))
 VARIABLE_FORMAT = '(\<([^\>|^\s]+)\>)'
+_VAR_RE = re.compile(VARIABLE_FORMAT)
 MUT_TYPE_M = 'm'
 MUT_TYPE_S = 's'
 BNF_PROGRAM = 'program'
@@ -43,9 +50,16 @@ TIMEOUT_PROG_EXECUTE = 1
 DEFAULT_LOG_FILE = 'pyneurgen.log'
 DEFAULT_LOG_LEVEL = logging.INFO
 
-logging.basicConfig(format='%(asctime)s %(message)s',
-                    filename=DEFAULT_LOG_FILE,
-                    level=DEFAULT_LOG_LEVEL)
+#   Compiled code objects keyed by program text.  Many genotypes collapse to
+#   the same phenotype program, so repeat programs skip the parse and compile.
+CODE_CACHE_SIZE = 1024
+_code_cache = {}
+
+#   Logging goes through a module logger with a null handler, so importing
+#   the package neither opens a file nor reconfigures the root logger.  See
+#   GrammaticalEvolution.enable_logging for switching on the log file.
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.NullHandler())
 
 
 class Genotype(object):
@@ -62,6 +76,17 @@ class Genotype(object):
 
     """
 
+    #   The fixed attributes live in slots, which trims the per-instance
+    #   memory for large populations and speeds up attribute access in the
+    #   mapping loops.  __dict__ is kept, created only on demand, because
+    #   generated programs and callers are free to attach their own payload,
+    #   such as data sets or a trained network.
+    __slots__ = ('member_no', 'local_bnf', '_max_program_length', '_fitness',
+        '_fitness_fail', '_wrap', '_extend_genotype', 'starttime',
+        '_timeouts', '_gene_length', '_max_gene_length', 'binary_gene',
+        'decimal_gene', '_position_idx', '_sequence_no', '_generation',
+        '_rule_table', '_dirty', 'errors', '__dict__')
+
     def __init__(self, start_gene_length,
                         max_gene_length,
                         member_no):
@@ -76,11 +101,13 @@ class Genotype(object):
 
         self.member_no = member_no
         self.local_bnf = {}
+        self._rule_table = {}
         self._max_program_length = None
         self._fitness = None
         self._fitness_fail = None
         self._wrap = True
         self._extend_genotype = True
+        self._dirty = True
         self.starttime = None
         self._timeouts = (0, 0)
 
@@ -92,22 +119,39 @@ class Genotype(object):
         self._generate_binary_gene(self._gene_length)
         self.generate_decimal_gene()
 
-        self._position = (0, 0)
+        self._position_idx = 0
+        self._sequence_no = 0
 
         self.errors = []
 
+    #   The position was once held as a (position, sequence_no) tuple, which
+    #   cost a tuple allocation per codon fetch.  It is now two plain ints,
+    #   with this property standing in for any outside reader of the pair.
+    @property
+    def _position(self):
+        """
+        This is the (position, sequence_no) pair for the next codon fetch.
+
+        """
+
+        return (self._position_idx, self._sequence_no)
+
+    @_position.setter
+    def _position(self, value):
+        self._position_idx = value[0]
+        self._sequence_no = value[1]
+
     def _generate_binary_gene(self, length):
         """
-        This function creates a random set of bits.
+        This function creates a random set of bits.  The codons are drawn in
+        bulk as unsigned bytes and unpacked to bits, rather than flipping a
+        coin per bit.
 
         """
 
-        geno = []
-        count = 0
-        while count < length * 8:
-            geno.append(str(random.randint(0, 1)))
-            count += 1
-        self.binary_gene = ''.join(geno)
+        codons = np.frombuffer(np.random.bytes(length), dtype=np.uint8)
+        self.binary_gene = (np.unpackbits(codons) +
+                                ord('0')).astype(np.uint8).tostring()
 
     def set_binary_gene(self, binary_gene):
         """
@@ -120,7 +164,8 @@ class Genotype(object):
         length = len(binary_gene)
         trunc_binary_gene = binary_gene[:length - (length % 8)]
         self.binary_gene = trunc_binary_gene
-        self._gene_length = len(self.binary_gene) / 8
+        self._gene_length = len(self.binary_gene) // 8
+        self._dirty = True
 
     def generate_decimal_gene(self):
         """
@@ -130,15 +175,13 @@ class Genotype(object):
 
         if self._gene_length == 0:
             raise ValueError("Invalid gene length")
-        dec_geno = []
+        if len(self.binary_gene) != self._gene_length * 8:
+            raise ValueError("Binary gene length does not match gene length")
 
-        for i in range(0, self._gene_length * 8, 8):
-            item = self.binary_gene[i:i + 8]
-            str_trans = base2tobase10(item)
-            dec_geno.append(int(str_trans))
-
-        self.decimal_gene = dec_geno
-        self._position = (0, 0)
+        bits = np.frombuffer(self.binary_gene, dtype=np.uint8) - ord('0')
+        self.decimal_gene = np.packbits(bits).tolist()
+        self._position_idx = 0
+        self._sequence_no = 0
 
     @staticmethod
     def _dec2bin_gene(dec_gene):
@@ -148,10 +191,8 @@ class Genotype(object):
 
         """
 
-        bin_gene = []
-        for item in dec_gene:
-            bin_gene.append(base10tobase2(item, zfill=8))
-        return ''.join(bin_gene)
+        bits = np.unpackbits(np.asarray(dec_gene, dtype=np.uint8))
+        return (bits + ord('0')).astype(np.uint8).tostring()
 
     @staticmethod
     def _place_material(program, item, start_pos, end_pos):
@@ -208,33 +249,18 @@ class Genotype(object):
         the use of exec, then this funtion should also be done as well, since
         it uses eval.
 
+        The conversions are dispatched through a module-level dict, since
+        this runs on the generated-program hot path via runtime_resolve.
+
         """
 
-        return_types = ['int', 'float', 'str', 'bool']
-
-        if return_type == 'str':
-            return value
-        elif return_type == 'int':
-            return conv_int(value)
-        elif return_type == 'float':
-            try:
-                value = float(value)
-            except:
-                #   allow normal error message to bubble up
-                value = eval(value)
-        elif return_type == 'bool':
-            if value in 'True':
-                value = True
-            elif value == 'False':
-                value = False
-            else:
-                msg = "return_type must be either True or False: %s"
-                raise ValueError(msg, value)
-        else:
-            msg = "return_type, %s must be in %s" % (value, return_types)
+        try:
+            converter = _FMT_DISPATCH[return_type]
+        except KeyError:
+            msg = "return_type, %s must be in %s" % (value, _RETURN_TYPES)
             raise ValueError(msg)
 
-        return value
+        return converter(value)
 
     def set_bnf_variable(self, variable_name, value):
         """
@@ -250,6 +276,13 @@ class Genotype(object):
         else:
             self.local_bnf[variable_name] = [str(value)]
 
+        if variable_name in self._rule_table:
+            #   The rule table is shared with the rest of the population, so
+            #   overriding a grammar rule drops it from a private copy and
+            #   lets resolution fall through to the local_bnf.
+            self._rule_table = dict(self._rule_table)
+            del self._rule_table[variable_name]
+
     def resolve_variable(self, variable):
         """
         This function receives a variable and using the variable as a key
@@ -257,17 +290,23 @@ class Genotype(object):
         are then used by the genotype via a codon to select a final value that
         would be used.
 
+        The choice is inlined rather than going through _select_choice,
+        because this runs once per codon and the values are guaranteed to be
+        lists by set_bnf_variable.
+
+        Grammar rules come pre-sized from the rule table built by set_bnf, so
+        the usual case skips the length computation; variables added or
+        overridden at run time fall through to the local_bnf.
+
         """
 
-        values = self.local_bnf[variable]
-        #try:
-        value = self._select_choice(self._get_codon(), values)
-        #except:
-            #raise ValueError("""
-                #Failure to resolve variable: %s values: %s
-                #""" % (variable, values))
+        try:
+            entry = self._rule_table[variable]
+        except KeyError:
+            values = self.local_bnf[variable]
+            return str(values[self._get_codon() % len(values)])
 
-        return str(value)
+        return str(entry[0][self._get_codon() % entry[1]])
 
     def _map_variables(self, program, check_stoplist):
         """
@@ -275,6 +314,11 @@ class Genotype(object):
         check_stoplist is True, then there will be a check to determine if it
         is a run-time variable, and therefor will be resolved later.
 
+        The program is held as a list of fragments, and resolved values are
+        spliced into the list in place.  That way each substitution costs only
+        the splice, rather than rebuilding and re-splitting the whole program
+        on every pass.
+
         This process runs until all of the variables have been satisfied, or a
         time limit on the process has been reached.
 
@@ -286,72 +330,90 @@ class Genotype(object):
 
             """
 
-            status = False
-            for stopitem in STOPLIST:
-                if item.find(stopitem) > -1:
-                    status = True
-
-            return status
+            return _STOP_RE.search(item) is not None
 
         self.errors = []
-        incomplete = True
-        prg_list = re.split(VARIABLE_FORMAT, program)
-        while incomplete:
-            position = 0
-            continue_map = False
-            while position < len(prg_list):
-                item = prg_list[position]
-                if item.strip() == '':
-                    del(prg_list[position])
+        prg_list = _VAR_RE.split(program)
+
+        #   The text fragments and the <variable> fragments add up to the
+        #   program; the inner match groups that trail each variable are
+        #   bookkeeping only and are deleted as the variables are visited.
+        total_length = len(program)
+        position = 0
+        while position < len(prg_list):
+            item = prg_list[position]
+            if item.strip() == '':
+                del(prg_list[position])
+                total_length -= len(item)
+            elif item[0] == "<" and item[-1] == ">":
+                #   check stop list
+                status = True
+                if check_stoplist and position > 0:
+                    if on_stoplist(prg_list[position - 1]):
+                        status = False
+
+                del(prg_list[position + 1])
+                if status:
+                    entry = self._rule_table.get(item)
+                    if entry is not None:
+                        #   Grammar rules come pre-tokenized, so the choice
+                        #   is spliced in without re-splitting it here.
+                        choices, length, splits = entry
+                        choice = self._get_codon() % length
+                        value = choices[choice]
+                        fragments = splits[choice]
+                        if fragments is None:
+                            prg_list[position] = value
+                        else:
+                            prg_list[position:position + 1] = fragments
+                    else:
+                        value = self.resolve_variable(item)
+                        if '<' in value:
+                            prg_list[position:position + 1] = \
+                                    _VAR_RE.split(value)
+                        else:
+                            #   Most values carry no further variables, so
+                            #   the split and splice can be skipped outright.
+                            prg_list[position] = value
+                    total_length += len(value) - len(item)
+
+                    #   Truncation to whole seconds keeps the comparison
+                    #   consistent with the timedelta.seconds it replaces.
+                    elapsed = int(_timer() - self.starttime)
+
+                    #   Reasons to fail the process
+                    if check_stoplist:
+                        #   Program already running
+                        if elapsed > \
+                                self._timeouts[TIMEOUT_PROG_EXECUTE]:
+                            msg = "elapsed time greater than program timeout"
+                            _logger.debug(msg)
+                            self.errors.append(msg)
+                            raise StandardError(msg)
+                    else:
+                        #   Preprogram
+                        if elapsed > \
+                                self._timeouts[TIMEOUT_PROG_BUILD]:
+                            msg = "elapsed time greater than preprogram " \
+                                    "timeout"
+                            _logger.debug(msg)
+                            self.errors.append(msg)
+                            raise StandardError(msg)
+
+                    if total_length > self._max_program_length:
+                        #   Runaway process
+                        msg = "program length, %s is beyond max program " \
+                                "length: %s" % (
+                                total_length, self._max_program_length)
+                        _logger.debug(msg)
+                        self.errors.append(msg)
+                        raise StandardError(msg)
                 else:
-                    if item[0] == "<" and item[-1] == ">":
-                        #   check stop list
-                        status = True
-                        if check_stoplist and position > 0:
-                            if on_stoplist(prg_list[position - 1]):
-                                status = False
-                        if status:
-                            prg_list[position] = self.resolve_variable(item)
-                            continue_map = True
-
-                        del(prg_list[position + 1])
                     position += 1
-
-            program = ''.join(prg_list)
-            prg_list = re.split(VARIABLE_FORMAT, program)
-            elapsed = datetime.now() - self.starttime
-
-            #   Reasons to fail the process
-            if check_stoplist:
-                #   Program already running
-                if elapsed.seconds > self._timeouts[TIMEOUT_PROG_EXECUTE]:
-                    msg = "elapsed time greater than program timeout"
-                    logging.debug(msg)
-                    self.errors.append(msg)
-                    raise StandardError(msg)
-                    #continue_map = False
             else:
-                #   Preprogram
-                if elapsed.seconds > self._timeouts[TIMEOUT_PROG_BUILD]:
-                    msg = "elapsed time greater than preprogram timeout"
-                    logging.debug(msg)
-                    self.errors.append(msg)
-                    raise StandardError(msg)
-                    #continue_map = False
-
-            if len(program) > self._max_program_length:
-                #   Runaway process
-                msg = "program length, %s is beyond max program length: %s" % (
-                            len(program), self._max_program_length)
-                logging.debug(msg)
-                logging.debug("program follows:")
-                #logging.debug(program)
-                self.errors.append(msg)
-                raise StandardError(msg)
-                #continue_map = False
-
-            if continue_map is False:
-                return program
+                position += 1
+
+        return ''.join(prg_list)
 
     def _get_codon(self):
         """
@@ -380,31 +442,77 @@ class Genotype(object):
         """
 
         #   position is the location on the gene, sequence_no is the number of
-        #   codons used since the start
-        position, sequence_no = self._position
-        length = len(self.decimal_gene)
+        #   codons used since the start.  The hot attributes are bound to
+        #   locals once, since this is the innermost loop of the mapping.
+        position = self._position_idx
+        sequence_no = self._sequence_no
+        decimal_gene = self.decimal_gene
+        length = len(decimal_gene)
+
+        if not self._wrap:
+            if sequence_no == self._max_gene_length:
+                raise ValueError("Max length of genotype reached.")
+        codon = decimal_gene[position]
+        if self._extend_genotype:
+            if sequence_no == length:
+                #   modify var directly
+                decimal_gene.append(codon)
+                self._gene_length = length + 1
+
+        position += 1
+        if position == length:
+            if self._wrap:
+                position = 0
+
+        self._position_idx = position
+        self._sequence_no = sequence_no + 1
+        return codon
+
+    def _consume_codons(self, count):
+        """
+        This function returns a list of the next count codons in one call.
+        It follows the same wrap and extension rules as _get_codon, but
+        hoists the attribute traffic out of the per-codon work, so callers
+        that know how many codons they need ahead of time pay the overhead
+        once rather than per codon.
+
+        """
+
+        position = self._position_idx
+        sequence_no = self._sequence_no
+        decimal_gene = self.decimal_gene
+        length = len(decimal_gene)
         wrap = self._wrap
+        extend = self._extend_genotype
+        max_gene_length = self._max_gene_length
 
-        status = True
-        while status:
+        codons = []
+        for _ in range(count):
             if not wrap:
-                if sequence_no == self._max_gene_length:
+                if sequence_no == max_gene_length:
+                    self._position_idx = position
+                    self._sequence_no = sequence_no
                     raise ValueError("Max length of genotype reached.")
-            codon = self.decimal_gene[position]
-            if self._extend_genotype:
+            codon = decimal_gene[position]
+            extended = False
+            if extend:
                 if sequence_no == length:
-                    #   modify var directly
-                    self.decimal_gene.append(codon)
-                    self._gene_length = len(self.decimal_gene)
+                    decimal_gene.append(codon)
+                    extended = True
 
             position += 1
             sequence_no += 1
             if position == length:
                 if wrap:
                     position = 0
+            if extended:
+                length += 1
+                self._gene_length = length
+            codons.append(codon)
 
-            self._position = (position, sequence_no)
-            return codon
+        self._position_idx = position
+        self._sequence_no = sequence_no
+        return codons
 
     def _reset_gene_position(self):
         """
@@ -415,7 +523,8 @@ class Genotype(object):
 
         """
 
-        self._position = (0, 0)
+        self._position_idx = 0
+        self._sequence_no = 0
 
     def _update_genotype(self):
         """
@@ -438,9 +547,10 @@ class Genotype(object):
         self._reset_gene_position()
         self._map_gene()
         if self._extend_genotype:
-            logging.debug("updating genotype...")
+            _logger.debug("updating genotype...")
             self._update_genotype()
-            logging.debug("Finished updating genotype...")
+            _logger.debug("Finished updating genotype...")
+        self._dirty = False
 
         return self._fitness
 
@@ -463,27 +573,27 @@ class Genotype(object):
 
         self.local_bnf['<fitness>'] = [str(self._fitness_fail)]
         try:
-            logging.debug("==================================================")
-            logging.debug("mapping variables to program...")
+            _logger.debug("==================================================")
+            _logger.debug("mapping variables to program...")
             self.local_bnf[BNF_PROGRAM] = [
                     'mapping variables into program failed']
             program = self._map_variables(self.local_bnf['<S>'][0], True)
-            logging.debug("finished mapping variables to program...")
+            _logger.debug("finished mapping variables to program...")
             self.local_bnf[BNF_PROGRAM] = [program]
             #print program[program.find('def'):]
-            logging.debug(program)
+            _logger.debug(program)
             self._execute_code(program)
-            logging.debug("==================================================")
+            _logger.debug("==================================================")
         except:
             #traceback.print_exc()
             #a = raw_input("waiting")
-            logging.debug("program failed")
+            _logger.debug("program failed")
             program = self.local_bnf['program'][0]
-            logging.debug("errors: %s", (self.errors))
-            logging.debug(program)
-            #logging.debug(traceback.print_exc())
-            logging.debug(traceback.format_exc())
-            logging.debug("end of failure report")
+            _logger.debug("errors: %s", (self.errors))
+            _logger.debug(program)
+            #_logger.debug(traceback.print_exc())
+            _logger.debug(traceback.format_exc())
+            _logger.debug("end of failure report")
             #a = raw_input("Program failed")
             #if a == "stop":
                 #raise ValueError("Program halted")
@@ -500,13 +610,9 @@ class Genotype(object):
 
         self.local_bnf['program'] = program
 
-        #   I'll revisit this again sometime.
-        #print "compiling code..."
-        #program_comp = compile(program, '<program>', 'exec')
-        #print "executing code..."
-        #exec program_comp
+        code = _compile_program(program)
         ns = locals()
-        exec(program) in ns
+        exec(code) in ns
 
     def mutate(self, mutation_rate, mutation_type):
         """
@@ -524,10 +630,14 @@ class Genotype(object):
             raise ValueError("The mutation type must be either '%s' or '%s'",
                 MUT_TYPE_S, MUT_TYPE_M)
 
-    def _multiple_mutate(self, mutation_rate):
+    def _multiple_mutate(self, mutation_rate, draws=None):
         """
-        This function walks the gene and based upon the mutation rate will
-        alter a bit.
+        This function subjects every bit of the gene to the mutation rate and
+        alters the bits that are selected.  The random draws are made in bulk
+        and folded into a per-codon mask, so one XOR pass flips all of the
+        selected bits at once.  A caller mutating many genes may pass in a
+        slice of a larger batch of draws, one per bit of the padded gene,
+        instead of paying for a separate numpy call per gene.
 
         """
 
@@ -538,14 +648,55 @@ class Genotype(object):
         else:
             pass
 
-        gene = self.binary_gene
-        length = len(gene)
-        for i in range(length):
-            if random.random() < mutation_rate:
-                gene = self._mutate(gene, i)
+        bits = np.frombuffer(self.binary_gene, dtype=np.uint8) - ord('0')
+        codons = np.packbits(bits)
+        if draws is None:
+            draws = np.random.random(codons.size * 8)
+        flips = (draws < mutation_rate).astype(np.uint8)
+        mask = np.packbits(flips)
+        if mask.any():
+            self._dirty = True
+        codons ^= mask
+
+        self.binary_gene = (np.unpackbits(codons) +
+                                ord('0')).astype(np.uint8).tostring()
+        self.decimal_gene = codons.tolist()
+        self._position = (0, 0)
 
-        self.set_binary_gene(''.join(gene))
-        self.generate_decimal_gene()
+    def _clone_for_crossover(self):
+        """
+        This function returns a copy of the genotype for use as a crossover
+        child.  The genome and operating parameters are copied directly;
+        the local_bnf becomes a shallow dict copy, since writes go through
+        set_bnf_variable, which rebinds keys rather than mutating the
+        shared value lists.  This replaces a deepcopy, which walked the
+        whole grammar and any payload attached by a generated program for
+        every child produced.
+
+        """
+
+        clone = Genotype.__new__(Genotype)
+        clone.member_no = self.member_no
+        clone.local_bnf = dict(self.local_bnf)
+        clone._rule_table = self._rule_table
+        clone._max_program_length = self._max_program_length
+        clone._fitness = self._fitness
+        clone._fitness_fail = self._fitness_fail
+        clone._wrap = self._wrap
+        clone._extend_genotype = self._extend_genotype
+        clone._dirty = self._dirty
+        clone.starttime = self.starttime
+        clone._timeouts = self._timeouts
+        clone._gene_length = self._gene_length
+        clone._max_gene_length = self._max_gene_length
+        clone.binary_gene = self.binary_gene
+        clone.decimal_gene = list(self.decimal_gene)
+        clone._generation = getattr(self, '_generation', 0)
+        clone._position_idx = 0
+        clone._sequence_no = 0
+        clone.errors = []
+
+        return clone
 
     def get_binary_gene_length(self):
         """
@@ -556,14 +707,16 @@ class Genotype(object):
 
         return self._gene_length * 8
 
-    def _single_mutate(self):
+    def _single_mutate(self, position=None):
         """
         This function with a randomly selects a mutation point within the gene
-        and changes a 1 to 0, or vice versa.
+        and changes a 1 to 0, or vice versa.  A caller that has already drawn
+        the mutation points for a batch of genes can pass the position in.
 
         """
 
-        position = random.randint(0, self._gene_length * 8 - 1)
+        if position is None:
+            position = random.randint(0, self._gene_length * 8 - 1)
         gene = self.binary_gene
 
         self.binary_gene = self._mutate(gene, position)
@@ -573,16 +726,15 @@ class Genotype(object):
     def _mutate(gene, position):
         """
         This function does the actual mutation of the gene at a specific
-        position.
+        position.  The flip is an XOR on a bytearray, since the characters
+        '0' and '1' differ only in the low bit.
 
         """
 
-        if gene[position] == '0':
-            gene = ''.join([gene[:position], "1", gene[position + 1:]])
-        else:
-            gene = ''.join([gene[:position], "0", gene[position + 1:]])
+        flipped = bytearray(gene)
+        flipped[position] ^= 0x01
 
-        return gene
+        return str(flipped)
 
     @staticmethod
     def _select_choice(codon, selection):
@@ -638,6 +790,49 @@ class Genotype(object):
         return self._fitness_fail
 
 
+def _compile_program(program):
+    """
+    This function compiles a program to a code object, pulling from a
+    module-level cache when the same program text has been seen before.  The
+    cache is simply cleared when it fills, which is adequate for the churn of
+    a run.
+
+    """
+
+    code = _code_cache.get(program)
+    if code is None:
+        if len(_code_cache) >= CODE_CACHE_SIZE:
+            _code_cache.clear()
+        code = compile(program, '<program>', 'exec')
+        _code_cache[program] = code
+
+    return code
+
+
+def _evaluate(genotype):
+    """
+    This function computes the fitness function for one genotype and returns a
+    small result tuple of (member_no, fitness, program, errors).
+
+    It lives at module level so that it can be pickled and mapped across a
+    pool of worker processes, such as multiprocessing.Pool, with one genotype
+    shipped per task.  This is the classic master-slave arrangement: the
+    fitness functions are independent of each other, so the population can be
+    spread across however many processors are available.
+
+    The start time is set here rather than by the caller, so that the mapping
+    and execution timeouts are measured in the worker where the work is
+    actually done.
+
+    """
+
+    genotype.starttime = _timer()
+    fitness = genotype.compute_fitness()
+
+    return (genotype.member_no, fitness, genotype.local_bnf[BNF_PROGRAM],
+                genotype.errors)
+
+
 def conv_int(str_value):
     """
     This method attempts to convert string value to an int.  This function
@@ -653,3 +848,52 @@ def conv_int(str_value):
         value = eval(str_value)
 
     return value
+
+
+def conv_float(str_value):
+    """
+    This function attempts to convert a string value to a float, falling
+    back to eval in the same fashion as conv_int.
+
+    """
+
+    try:
+        value = float(str_value)
+    except:
+        #   allow normal error message to bubble up
+        value = eval(str_value)
+
+    return value
+
+
+def conv_bool(str_value):
+    """
+    This function converts a string value to True or False.
+
+    """
+
+    if str_value in 'True':
+        return True
+    elif str_value == 'False':
+        return False
+    else:
+        msg = "return_type must be either True or False: %s"
+        raise ValueError(msg, str_value)
+
+
+def _conv_str(str_value):
+    """
+    This function passes a string value through unchanged.
+
+    """
+
+    return str_value
+
+
+_RETURN_TYPES = ('int', 'float', 'str', 'bool')
+_FMT_DISPATCH = {
+    'int': conv_int,
+    'float': conv_float,
+    'str': _conv_str,
+    'bool': conv_bool,
+    }
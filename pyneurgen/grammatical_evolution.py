@@ -34,18 +34,37 @@ Hoped for course for implementation:
 
 """
 
-from datetime import datetime
+from collections import deque
 from copy import deepcopy
 import logging
+from multiprocessing import Pool, cpu_count
+from operator import index as _int_index
 from random import randint
+import re
 
-from pyneurgen.genotypes import Genotype, MUT_TYPE_M, MUT_TYPE_S
+import numpy as np
+
+from pyneurgen.genotypes import Genotype, MUT_TYPE_M, MUT_TYPE_S, _timer, \
+        _VAR_RE
 from pyneurgen.fitness import FitnessList, Fitness, Replacement
 from pyneurgen.fitness import CENTER, MAX, MIN
 
+try:
+    xrange
+except NameError:
+    #   Python 3
+    xrange = range
+
 
 #   Constants
 STATEMENT_FORMAT = '<S'
+
+#   A rule is a line holding ::=, together with the following lines up to
+#   the next such line.
+_BNF_RULE_RE = re.compile(
+    r'^(?P<key>[^\n]*?)::='
+    r'(?P<block>[^\n]*(?:\n(?![^\n]*::=)[^\n]*)*)', re.MULTILINE)
+
 STOPPING_MAX_GEN = 'max_generations'
 STOPPING_FITNESS_LANDSCAPE = 'fitness_landscape'
 
@@ -63,12 +82,21 @@ DEFAULT_MAX_PROGRAM_LENGTH = None
 DEFAULT_FITNESS_FAIL = -1000.0
 DEFAULT_MAINTAIN_HISTORY = True
 DEFAULT_TIMEOUTS = [20, 3600]
+DEFAULT_PARALLEL = False
+DEFAULT_MAX_WORKERS = None
+DEFAULT_STEADY_GENERATIONS = None
+DEFAULT_STEADY_EPSILON = 0.0
 
 DEFAULT_LOG_FILE = 'pyneurgen.log'
 
-logging.basicConfig(format='%(asctime)s %(message)s',
-                    filename=DEFAULT_LOG_FILE,
-                    level=logging.INFO)
+DEFAULT_LOG_FORMAT = '%(asctime)s %(message)s'
+DEFAULT_LOG_LEVEL = logging.INFO
+
+#   Logging goes through a module logger with a null handler, so importing
+#   the package neither opens a file nor reconfigures the root logger.  Use
+#   GrammaticalEvolution.enable_logging to switch on the log file.
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.NullHandler())
 
 
 class GrammaticalEvolution(object):
@@ -78,6 +106,21 @@ class GrammaticalEvolution(object):
     those members.
     """
 
+    #   The named attributes live in slots, so the lookups in the
+    #   per-generation loops bypass the instance dictionary; __dict__ is
+    #   kept so that subclasses remain free to add their own attributes.
+    __slots__ = ('stopping_criteria', '_crossover_rate',
+        '_children_per_crossover', '_mutation_type', '_mutation_rate',
+        '_max_fitness_rate', '_wrap', '_extend_genotype',
+        '_start_gene_length', '_max_gene_length', '_max_program_length',
+        '_generation', 'fitness_list', '_fitness_fail', '_maintain_history',
+        '_timeouts', '_parallel', '_max_workers', '_mpi_comm',
+        '_steady_generations', '_steady_epsilon', '_best_history',
+        '_pool', '_pool_size', '_pool_grammar', 'current_g',
+        '_fitness_selections', '_replacement_selections', 'bnf',
+        '_rule_table', '_population_size', 'population', '_history',
+        '__dict__')
+
     def __init__(self):
         """
         Because there are a number of parameters to specify, there are no
@@ -111,6 +154,15 @@ class GrammaticalEvolution(object):
         self._fitness_fail = DEFAULT_FITNESS_FAIL
         self._maintain_history = DEFAULT_MAINTAIN_HISTORY
         self._timeouts = DEFAULT_TIMEOUTS
+        self._parallel = DEFAULT_PARALLEL
+        self._max_workers = DEFAULT_MAX_WORKERS
+        self._mpi_comm = None
+        self._steady_generations = DEFAULT_STEADY_GENERATIONS
+        self._steady_epsilon = DEFAULT_STEADY_EPSILON
+        self._best_history = None
+        self._pool = None
+        self._pool_size = None
+        self._pool_grammar = None
 
         #   Parameters used during runtime
         self.current_g = None
@@ -118,6 +170,7 @@ class GrammaticalEvolution(object):
         self._replacement_selections = []
 
         self.bnf = {}
+        self._rule_table = {}
         self._population_size = 0
         self.population = []
 
@@ -130,16 +183,20 @@ class GrammaticalEvolution(object):
 
         """
 
-        size = long(size)
-        if isinstance(size, long) and size > 0:
+        try:
+            size = _int_index(size)
+        except TypeError:
+            raise ValueError("""
+                population size, %s, must be an int above 0""" % (size))
+        if size > 0:
             self._population_size = size
-            i = len(self.fitness_list)
-            while i < size:
-                self.fitness_list.append([0.0, i])
-                i += 1
+            current = len(self.fitness_list)
+            if current < size:
+                self.fitness_list.extend(
+                        [[0.0, i] for i in xrange(current, size)])
         else:
             raise ValueError("""
-                population size, %s, must be a long above 0""" % (size))
+                population size, %s, must be an int above 0""" % (size))
 
     def get_population_size(self):
         """
@@ -164,17 +221,19 @@ class GrammaticalEvolution(object):
         if max_gene_length is None:
             max_gene_length = start_gene_length
 
-        start_gene_length = long(start_gene_length)
-        max_gene_length = long(max_gene_length)
-        if not isinstance(start_gene_length, long):
-            raise ValueError("start_gene_length, %s, must be a long" % (
+        try:
+            start_gene_length = _int_index(start_gene_length)
+        except TypeError:
+            raise ValueError("start_gene_length, %s, must be an int" % (
                                                     start_gene_length))
+        try:
+            max_gene_length = _int_index(max_gene_length)
+        except TypeError:
+            raise ValueError("max_gene_length, %s, must be an int" % (
+                                                    max_gene_length))
         if start_gene_length < 0:
             raise ValueError("start_gene_length, %s, must be above 0" % (
                                                     start_gene_length))
-        if not isinstance(max_gene_length, long):
-            raise ValueError("max_gene_length, %s, must be a long" % (
-                                                    max_gene_length))
         if max_gene_length < 0:
             raise ValueError("max_gene_length, %s, must be above 0" % (
                                                     max_gene_length))
@@ -257,39 +316,45 @@ class GrammaticalEvolution(object):
         not automatically stripped from the front.  This enables python
         oriented white space to be honored.
 
+        The grammar is carved into rules with a single compiled regex, one
+        match per rule including its continuation lines, rather than
+        scanning every line twice for ::= and carrying the current key
+        across iterations.
+
         """
 
-        def strip_spaces(key, values):
-            """
-            This removes white space unless it is a statement.
-            """
+        bnf_dict = {}
+        for match in _BNF_RULE_RE.finditer(bnf):
+            key = match.group('key').strip()
             if key.startswith(STATEMENT_FORMAT):
+                #   Spaces on the left are python indentation; only the
+                #   right side is trimmed, and the lines of the statement
+                #   are joined back into a single string.
                 values = [value.rstrip()
-                    for value in values.split('|') if value]
-            else:
-                values = [value.strip()
-                    for value in values.split('|') if value]
-
-            return values
-
-        bnf_dict = {}
-        for item in bnf.split('\n'):
-            if item.find('::=') >= 0:
-                key, values = item.split('::=')
-                key = key.strip()
-                bnf_dict[key] = strip_spaces(key, values)
-            elif item:
-                values = bnf_dict[key]
-                values.extend(strip_spaces(key, item))
-                if key.startswith(STATEMENT_FORMAT):
-                    #   Convert statements back to string
+                    for line in match.group('block').split('\n')
+                        for value in line.split('|') if value]
+                if values:
                     values = ['\n'.join(values)]
-                bnf_dict[key] = values
             else:
-                #   blank line
-                pass
+                values = [value.strip()
+                    for line in match.group('block').split('\n')
+                        for value in line.split('|') if value]
+            bnf_dict[key] = values
         self.bnf = bnf_dict
 
+        #   Specialize the grammar once, up front:  each rule is stored with
+        #   its choices as a tuple, the choice count, and the choices
+        #   pre-tokenized on their embedded variables, so that the mapping
+        #   hot loop in the genotypes neither recomputes the length nor
+        #   re-splits a choice for any codon.  The table is shared by the
+        #   whole population.
+        self._rule_table = {}
+        for key, values in bnf_dict.items():
+            splits = tuple([tuple(_VAR_RE.split(value))
+                        if '<' in value else None
+                            for value in values])
+            self._rule_table[key] = (tuple(values), len(values), splits)
+
     def get_bnf(self):
         """
         This function returns the Backus Naur form of variables that are used
@@ -299,6 +364,131 @@ class GrammaticalEvolution(object):
 
         return self.bnf
 
+    def set_parallel(self, true_false):
+        """
+        This function sets a flag to spread the fitness computations across
+        a pool of worker processes, one genotype per task.  The fitness
+        functions are independent of each other, so this scales with the
+        number of processors.  Selection, crossover, mutation and
+        replacement remain sequential.
+
+        """
+
+        if isinstance(true_false, bool):
+            self._parallel = true_false
+        else:
+            raise ValueError("Parallel must be True or False")
+
+    def get_parallel(self):
+        """
+        This function returns whether the fitness computations are spread
+        across a pool of worker processes.
+
+        """
+
+        return self._parallel
+
+    def set_max_workers(self, max_workers):
+        """
+        This function sets the number of worker processes used when parallel
+        processing is turned on.  If set to None, the processor count is
+        used.
+
+        """
+
+        if max_workers is None:
+            self._max_workers = None
+        else:
+            max_workers = int(max_workers)
+            if max_workers > 0:
+                self._max_workers = max_workers
+            else:
+                raise ValueError("""
+                    max_workers, %s, must be an int above 0""" % (max_workers))
+
+    def get_max_workers(self):
+        """
+        This function returns the number of worker processes used when
+        parallel processing is turned on.
+
+        """
+
+        return self._max_workers
+
+    def set_mpi_comm(self, comm):
+        """
+        This function sets an MPI communicator, such as mpi4py's COMM_WORLD,
+        for spreading the fitness computations across the ranks of a
+        cluster.  Pass None to go back to single-node processing.
+
+        The communicator is simply held and used, so mpi4py is not a
+        requirement of this package; any object with the scatter, gather,
+        bcast, Get_rank and Get_size methods will do.  When a communicator
+        is set it takes precedence over the process-pool option.
+
+        """
+
+        self._mpi_comm = comm
+
+    def get_mpi_comm(self):
+        """
+        This function returns the MPI communicator, if one has been set.
+
+        """
+
+        return self._mpi_comm
+
+    def set_steady_fitness(self, generations, epsilon=0.0):
+        """
+        This function turns on early stopping when the fitness values reach
+        a plateau.  If the best fitness value has improved by no more than
+        epsilon over the given number of consecutive generations, the run
+        halts rather than burning further generations on a flat landscape.
+        The number of generations must be an int of at least 2, and epsilon
+        a float of at least 0.0.
+
+        """
+
+        try:
+            generations = _int_index(generations)
+        except TypeError:
+            raise ValueError("""The steady generations, %s, must be an int
+                    of at least 2""" % (generations))
+        if generations < 2:
+            raise ValueError("""The steady generations, %s, must be an int
+                    of at least 2""" % (generations))
+        if not isinstance(epsilon, float) or epsilon < 0.0:
+            raise ValueError("""The epsilon, %s, must be a float of at
+                    least 0.0""" % (epsilon))
+
+        self._steady_generations = generations
+        self._steady_epsilon = epsilon
+        self._best_history = deque(maxlen=generations)
+
+    def get_steady_fitness(self):
+        """
+        This function returns the number of generations and the epsilon
+        used for stopping on a fitness plateau, if they have been set.
+
+        """
+
+        return (self._steady_generations, self._steady_epsilon)
+
+    @staticmethod
+    def enable_logging(filename=DEFAULT_LOG_FILE, level=DEFAULT_LOG_LEVEL):
+        """
+        This function attaches a file handler to the package logger.  The
+        run logs previously went to a file configured as a side effect of
+        importing this module; logging is now off until this is called.
+
+        """
+
+        handler = logging.FileHandler(filename)
+        handler.setFormatter(logging.Formatter(DEFAULT_LOG_FORMAT))
+        logger = logging.getLogger('pyneurgen')
+        logger.addHandler(handler)
+        logger.setLevel(level)
+
     def set_maintain_history(self, true_false):
         """
         This function sets a flag to maintain a history of fitness_lists.
@@ -325,15 +515,14 @@ class GrammaticalEvolution(object):
 
         """
 
-        errmsg1 = """The maximum program length, %s must be an long value
-                    """ % (max_program_length)
-        errmsg2 = """The maximum program length, %s must be greater than 0
-                    """ % (max_program_length)
-        max_program_length = long(max_program_length)
-        if not isinstance(max_program_length, long):
-            raise ValueError(errmsg1)
+        try:
+            max_program_length = _int_index(max_program_length)
+        except TypeError:
+            raise ValueError("""The maximum program length, %s must be an int
+                    value""" % (max_program_length))
         if max_program_length < 0:
-            raise ValueError(errmsg2)
+            raise ValueError("""The maximum program length, %s must be greater
+                    than 0""" % (max_program_length))
 
         self._max_program_length = max_program_length
 
@@ -355,12 +544,12 @@ class GrammaticalEvolution(object):
 
         """
 
-        errmsg = """The fitness_fail, %s must be a float value
-                    """ % (fitness_fail)
         #   coerce if possible
-        fitness_fail = float(fitness_fail)
-        if not isinstance(fitness_fail, float):
-            raise ValueError(errmsg)
+        try:
+            fitness_fail = float(fitness_fail)
+        except (TypeError, ValueError):
+            raise ValueError("""The fitness_fail, %s must be a float value
+                    """ % (fitness_fail))
 
         self._fitness_fail = fitness_fail
 
@@ -384,10 +573,9 @@ class GrammaticalEvolution(object):
 
         """
 
-        errmsg = "The mutation type must be either '%s' or '%s'." % (
-                                                    MUT_TYPE_S, MUT_TYPE_M)
         if mutation_type not in [MUT_TYPE_M, MUT_TYPE_S]:
-            raise ValueError(errmsg)
+            raise ValueError("The mutation type must be either '%s' or '%s'."
+                                        % (MUT_TYPE_S, MUT_TYPE_M))
 
         self._mutation_type = mutation_type
 
@@ -414,12 +602,10 @@ class GrammaticalEvolution(object):
 
         """
 
-        errmsg = """The mutation rate, %s must be a float value
-                    from 0.0 to 1.0""" % (mutation_rate)
-        if not isinstance(mutation_rate, float):
-            raise ValueError(errmsg)
-        if not (0.0 <= mutation_rate <= 1.0):
-            raise ValueError(errmsg)
+        if not isinstance(mutation_rate, float) or \
+                not (0.0 <= mutation_rate <= 1.0):
+            raise ValueError("""The mutation rate, %s must be a float value
+                    from 0.0 to 1.0""" % (mutation_rate))
 
         self._mutation_rate = mutation_rate
 
@@ -446,12 +632,10 @@ class GrammaticalEvolution(object):
 
         """
 
-        errmsg = """The crossover rate, %s must be a float value
-                    from 0.0 to 1.0""" % (crossover_rate)
-        if not isinstance(crossover_rate, float):
-            raise ValueError(errmsg)
-        if not (0.0 <= crossover_rate <= 1.0):
-            raise ValueError(errmsg)
+        if not isinstance(crossover_rate, float) or \
+                not (0.0 <= crossover_rate <= 1.0):
+            raise ValueError("""The crossover rate, %s must be a float value
+                    from 0.0 to 1.0""" % (crossover_rate))
 
         self._crossover_rate = crossover_rate
 
@@ -546,12 +730,10 @@ class GrammaticalEvolution(object):
 
         """
 
-        errmsg = """The max fitness rate, %s must be a float value
-                    from 0.0 to 1.0""" % (max_fitness_rate)
-        if not isinstance(max_fitness_rate, float):
-            raise ValueError(errmsg)
-        if not (0.0 <= max_fitness_rate <= 1.0):
-            raise ValueError(errmsg)
+        if not isinstance(max_fitness_rate, float) or \
+                not (0.0 <= max_fitness_rate <= 1.0):
+            raise ValueError("""The max fitness rate, %s must be a float value
+                    from 0.0 to 1.0""" % (max_fitness_rate))
 
         self._max_fitness_rate = max_fitness_rate
 
@@ -611,6 +793,16 @@ class GrammaticalEvolution(object):
 
         hist_list = []
         for fitness_list in self._history:
+            if not isinstance(fitness_list, FitnessList):
+                #   The row is a compact array of fitness values whose
+                #   positions are the member numbers; re-expand it so any
+                #   statistic the fitness list offers can be used.
+                values = fitness_list
+                fitness_list = FitnessList(
+                            self.fitness_list.get_fitness_type(),
+                            self.fitness_list.get_target_value())
+                fitness_list.extend([[float(value), member_no]
+                            for member_no, value in enumerate(values)])
             hist_list.append(fitness_list.__getattribute__(statistic)())
         return hist_list
 
@@ -678,26 +870,163 @@ class GrammaticalEvolution(object):
     def _compute_fitness(self):
         """
         This function runs the process of computing fitness functions for each
-        genotype and calculating the fitness function.
+        genotype and calculating the fitness function.  If the parallel flag
+        is set, the genotypes are shipped to a pool of worker processes
+        instead of being evaluated in sequence.
+
+        """
+
+        if self._mpi_comm is not None:
+            self._compute_fitness_mpi()
+        elif self._parallel and len(self.population) > 1:
+            self._compute_fitness_parallel()
+        else:
+            #   The level is checked once out here, so the hot loop does not
+            #   format debug messages that the logger would only throw away.
+            debug = _logger.isEnabledFor(logging.DEBUG)
+            for gene in self.population:
+                gene._generation = self._generation
+                if not gene._dirty:
+                    #   The gene is unchanged since its last evaluation, as
+                    #   with elites carried between generations, so the
+                    #   fitness it already holds is still valid.
+                    self.fitness_list[gene.member_no][0] = gene.get_fitness()
+                    continue
+                starttime = _timer()
+                if debug:
+                    _logger.debug("Starting member G %s: %s at %s",
+                        self._generation, gene.member_no, starttime)
+
+                gene.starttime = starttime
+                self.current_g = gene
+                gene.compute_fitness()
+
+                fitness = gene.get_fitness()
+                if debug:
+                    _logger.debug("fitness=%s", fitness)
+                self.fitness_list[gene.member_no][0] = fitness
+
+    def _compute_fitness_parallel(self):
+        """
+        This function spreads the fitness computations across a pool of
+        worker processes, one genotype per task.  The returned genes take
+        the place of the originals, because evaluation modifies gene state
+        such as the generated program and any genotype extension.  The
+        start times are stamped in the workers so that the timeouts are
+        measured where the work is done.
+
+        The pool of workers is created once and reused across generations,
+        so each generation pays only for shipping the genes, not for
+        forking a fresh set of processes.
 
         """
 
         for gene in self.population:
-            starttime = datetime.now()
             gene._generation = self._generation
-            logging.debug("Starting member G %s: %s at %s" % (
-                self._generation, gene.member_no,
-                starttime.strftime('%m/%d/%y %H:%M')))
-
-            #print "Starting member G %s: %s at %s" % (
-                #self._generation, gene.member_no,
-                #starttime.strftime('%m/%d/%y %H:%M'))
-            gene.starttime = starttime
-            self.current_g = gene
+
+        #   Genes that are unchanged since their last evaluation, such as
+        #   elites carried between generations, keep the fitness that they
+        #   already hold and stay out of the pool.
+        pending = [gene for gene in self.population if gene._dirty]
+
+        workers = self._max_workers
+        if workers is None:
+            workers = cpu_count()
+        chunksize = max(1, len(pending) // (workers * 4))
+
+        if pending:
+            #   The workers hold the grammar already, so only each gene's
+            #   own additions and overrides are shipped either way.
+            bnf = self.bnf
+            for gene in pending:
+                _shrink_gene(gene, bnf)
+
+            for gene in self._worker_pool(workers).map(
+                        _eval_gene, pending, chunksize):
+                self.population[gene.member_no] = _restore_gene(
+                        gene, bnf, self._rule_table)
+
+        for gene in self.population:
+            fitness = gene.get_fitness()
+            _logger.debug("fitness=%s", fitness)
+            self.fitness_list[gene.member_no][0] = fitness
+
+    def _worker_pool(self, workers):
+        """
+        This function returns the persistent pool of worker processes,
+        creating it on first use and rebuilding it only when the number of
+        workers or the grammar has changed.  The workers are daemonic, so
+        they end with the parent process.  Each worker receives the shared
+        grammar once through its initializer.
+
+        """
+
+        if self._pool is None or self._pool_size != workers \
+                or self._pool_grammar is not self._rule_table:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+            self._pool = Pool(processes=workers, initializer=_init_worker,
+                        initargs=(self.bnf, self._rule_table))
+            self._pool_size = workers
+            self._pool_grammar = self._rule_table
+
+        return self._pool
+
+    def _compute_fitness_mpi(self):
+        """
+        This function scatters the population across the ranks of an MPI
+        communicator, each rank evaluates its share, and the genes are
+        gathered back to the root in the master-slave fashion.  The root
+        rank holds the authoritative population; the updated fitness list is
+        broadcast so that every rank reaches the same stopping decisions.
+
+        """
+
+        comm = self._mpi_comm
+        rank = comm.Get_rank()
+        size = comm.Get_size()
+
+        if rank == 0:
+            for gene in self.population:
+                gene._generation = self._generation
+            #   Only genes changed since their last evaluation are shipped
+            #   out; unchanged genes keep the fitness they already hold.
+            pending = [gene for gene in self.population if gene._dirty]
+            chunks = [pending[i::size] for i in range(size)]
+        else:
+            chunks = None
+
+        chunk = comm.scatter(chunks, root=0)
+        for gene in chunk:
+            gene.starttime = _timer()
             gene.compute_fitness()
 
-            logging.debug("fitness=%s" % (gene.get_fitness()))
-            self.fitness_list[gene.member_no][0] = gene.get_fitness()
+        gathered = comm.gather(chunk, root=0)
+        if rank == 0:
+            positions = dict([(gene.member_no, position)
+                        for position, gene in enumerate(self.population)])
+            for chunk in gathered:
+                for gene in chunk:
+                    self.population[positions[gene.member_no]] = gene
+                    fitness = gene.get_fitness()
+                    _logger.debug("fitness=%s", fitness)
+                    self.fitness_list[gene.member_no][0] = fitness
+
+        self.fitness_list[:] = comm.bcast(self.fitness_list, root=0)
+
+    def _record_history(self):
+        """
+        This function appends a compact snapshot of the current fitness
+        values to the history.  Only the values are kept, as a float array
+        whose positions are the member numbers, rather than a deep copy of
+        the whole fitness list; for long runs with large populations that
+        is a fraction of the memory and of the snapshot time.
+
+        """
+
+        self._history.append(np.array(
+                [pair[0] for pair in self.fitness_list], dtype=np.float32))
 
     def run(self, starting_generation=0):
         """
@@ -707,20 +1036,20 @@ class GrammaticalEvolution(object):
 
         """
 
-        logging.info("started run")
+        _logger.info("started run")
         self._generation = starting_generation
         while True:
             self._compute_fitness()
             if self._maintain_history:
-                self._history.append(deepcopy(self.fitness_list))
+                self._record_history()
 
             if self._continue_processing():
                 self._perform_endcycle()
 
-                logging.info("Finished generation: %s Max generations: %s" % (
+                _logger.info("Finished generation: %s Max generations: %s" % (
                             self._generation,
                             self.get_max_generations()))
-                logging.info(' '.join(
+                _logger.info(' '.join(
                             ["best_value: %s" % (
                                 self.fitness_list.best_value()),
                             "median: %s" % (self.fitness_list.median()),
@@ -728,14 +1057,14 @@ class GrammaticalEvolution(object):
                 #temp -- remove this
                 gene = self.population[self.fitness_list.best_member()]
                 program = gene.get_program()
-                logging.info(program)
+                _logger.info(program)
 
-                #logging.debug("stddev= %s" % self.fitness_list.stddev())
+                #_logger.debug("stddev= %s" % self.fitness_list.stddev())
                 self._generation += 1
             else:
                 break
 
-        logging.info(
+        _logger.info(
             "completed run: generations: %s, best member:%s fitness: %s" % (
                     self._generation,
                     self.fitness_list.best_member(),
@@ -757,9 +1086,13 @@ class GrammaticalEvolution(object):
                         self._max_gene_length,
                         member_no)
             #   a local copy is made because variables
-            #   can be saved within the local_bnf
-            gene.local_bnf = deepcopy(self.bnf)
+            #   can be saved within the local_bnf.  The copy is shallow:
+            #   the value lists are shared by reference, since writes go
+            #   through set_bnf_variable, which rebinds the key to a new
+            #   list rather than mutating the shared one.
+            gene.local_bnf = dict(self.bnf)
             gene.local_bnf['<member_no>'] = [gene.member_no]
+            gene._rule_table = self._rule_table
             gene._max_program_length = self._max_program_length
             gene._fitness = self._fitness_fail
             gene._fitness_fail = self._fitness_fail
@@ -775,18 +1108,22 @@ class GrammaticalEvolution(object):
         their fitness function.  Then, the fitness selection objects will
         evaluate those members according to their respective criteria and
         develop a pool of members that will potentially survive to the next
-        generation. Crossovers will take place from that pool and each member
+        generation. Crossovers will take place from that pool and each child
         will be subject to the possibility of mutatuting.  Finally, a
         replacement process will find which members should be replaced. The
         fitness pool will then replace those members.
 
+        Only the children are put at risk of mutation.  The parents earned
+        their place in the pool through fitness selection, and leaving them
+        intact also means the pool is walked once instead of twice.
+
         """
 
         fitness_pool = self._evaluate_fitness()
         child_list = self._perform_crossovers(fitness_pool)
+        self._perform_mutations(child_list)
 
         fitness_pool.extend(child_list)
-        self._perform_mutations(fitness_pool)
         self._perform_replacements(fitness_pool)
 
     def _evaluate_fitness(self):
@@ -800,21 +1137,15 @@ class GrammaticalEvolution(object):
         flist = []
         total = int(round(
             self._max_fitness_rate * float(self._population_size)))
-        count = 0
         for fsel in self._fitness_selections:
             fsel.set_fitness_list(self.fitness_list)
-            for i in fsel.select():
-                flist.append(i)
-                count += 1
-                if count == total:
-                    #   Done
-                    break
-
-        flist1 = []
-        for member_no in flist:
-            flist1.append(deepcopy(self.population[member_no]))
+            flist.extend(fsel.select())
+            if len(flist) >= total:
+                break
+        del flist[total:]
 
-        return flist1
+        return [deepcopy(self.population[member_no])
+                    for member_no in flist]
 
     def _perform_crossovers(self, flist):
         """
@@ -830,25 +1161,45 @@ class GrammaticalEvolution(object):
         if length % 2 == 1:
             length -= 1
         if length >= 2:
-            for i in xrange(0, length, 2):
-                parent1 = flist[i]
-                parent2 = flist[i + 1]
-
-                child1, child2 = self._crossover(parent1, parent2)
-                if self._children_per_crossover == 2:
-                    child_list.append(child1)
+            #   All of the random draws for the pass are made up front in
+            #   bulk:  the parent-order coin flips, and the crosspoints from
+            #   the per-pair minimum gene lengths.
+            pairs = length // 2
+            flips = np.random.randint(0, 2, size=pairs)
+            minlengths = np.array([
+                    min(len(flist[i].binary_gene),
+                        len(flist[i + 1].binary_gene))
+                    for i in xrange(0, length, 2)], dtype=np.int64)
+            crosspoints = 2 + (np.random.random(pairs) *
+                                    (minlengths - 3)).astype(np.int64)
+
+            #   The number of children kept per crossover does not change
+            #   mid-pass, so the branch is decided once here.
+            both_children = self._children_per_crossover == 2
+
+            for pair in xrange(pairs):
+                parent1 = flist[pair * 2]
+                parent2 = flist[pair * 2 + 1]
+
+                child1, child2 = self._crossover(parent1, parent2,
+                                        flip=flips[pair],
+                                        crosspoint=int(crosspoints[pair]))
+                child_list.append(child1)
+                if both_children:
                     child_list.append(child2)
-                else:
-                    child_list.append(child1)
 
         return child_list
 
-    def _crossover(self, parent1, parent2):
+    def _crossover(self, parent1, parent2, flip=None, crosspoint=None):
         """
         This function accepts two parents, randomly selects which is parent1
         and which is parent2.  Then, executes the crossover, and returns two
         children.
 
+        The parent-order flip and the crosspoint can be passed in, so that
+        _perform_crossovers can draw them in bulk for a whole pass; when
+        they are not given, they are drawn here as before.
+
         """
 
         if not isinstance(parent1, Genotype):
@@ -856,21 +1207,24 @@ class GrammaticalEvolution(object):
         if not isinstance(parent2, Genotype):
             raise ValueError("Parent2 is not a genotype")
 
-        if randint(0, 1):
-            child1 = deepcopy(parent1)
-            child2 = deepcopy(parent2)
+        if flip is None:
+            flip = randint(0, 1)
+        if flip:
+            child1 = parent1._clone_for_crossover()
+            child2 = parent2._clone_for_crossover()
         else:
-            child1 = deepcopy(parent2)
-            child2 = deepcopy(parent1)
+            child1 = parent2._clone_for_crossover()
+            child2 = parent1._clone_for_crossover()
 
         child1_binary = child1.binary_gene
         child2_binary = child2.binary_gene
 
-        minlength = min(len(child1_binary), len(child2_binary))
-        crosspoint = randint(2, minlength - 2)
+        if crosspoint is None:
+            minlength = min(len(child1_binary), len(child2_binary))
+            crosspoint = randint(2, minlength - 2)
 
         child1_binary, child2_binary = self._crossover_function(
-            child1.binary_gene, child2.binary_gene, crosspoint)
+            child1_binary, child2_binary, crosspoint)
 
         child1.set_binary_gene(child1_binary)
         child1.generate_decimal_gene()
@@ -903,10 +1257,37 @@ class GrammaticalEvolution(object):
         mutation.  Each genotype is then put at risk for mutation and may or
         may not be mutated.
 
-        """
-
-        for gene in mlist:
-            gene.mutate(self._mutation_rate, self._mutation_type)
+        The random draws for the whole list are made in bulk numpy calls
+        rather than one call per gene.  For single mutation that covers
+        the at-risk draw and the mutation point; for multiple mutation one
+        flat batch of per-bit draws is split across the genes, since the
+        genes can differ in length.
+
+        """
+
+        if self._mutation_type == MUT_TYPE_S and mlist:
+            draws = np.random.random(len(mlist))
+            at_risk = [gene for gene, draw in zip(mlist, draws)
+                            if draw < self._mutation_rate]
+            if at_risk:
+                lengths = np.array(
+                    [gene._gene_length * 8 for gene in at_risk],
+                    dtype=np.int64)
+                positions = (np.random.random(len(at_risk)) *
+                                lengths).astype(np.int64)
+                for gene, position in zip(at_risk, positions):
+                    gene._single_mutate(int(position))
+        elif self._mutation_type == MUT_TYPE_M and mlist:
+            sizes = [(len(gene.binary_gene) + 7) // 8 * 8 for gene in mlist]
+            draws = np.random.random(sum(sizes))
+            start = 0
+            for gene, size in zip(mlist, sizes):
+                gene._multiple_mutate(self._mutation_rate,
+                                        draws[start:start + size])
+                start += size
+        else:
+            for gene in mlist:
+                gene.mutate(self._mutation_rate, self._mutation_type)
 
     def _perform_replacements(self, fitness_pool):
         """
@@ -914,32 +1295,44 @@ class GrammaticalEvolution(object):
         performers.  The replacement process then applies the fitness pool to
         the population.
 
+        The population, fitness list, next generation number, and pool
+        length are bound to locals up front, which keeps the repeated
+        attribute lookups out of the inner loop.
+
         """
 
+        population = self.population
+        fitness_list = self.fitness_list
+        next_generation = self._generation + 1
+        pool_length = len(fitness_pool)
+
         position = 0
         for rsel in self._replacement_selections:
-            rsel.set_fitness_list(self.fitness_list)
+            rsel.set_fitness_list(fitness_list)
 
             for replaced_no in rsel.select():
-                replaced_g = self.population[replaced_no]
-                if position < len(fitness_pool):
-                    new_g = fitness_pool[position]
-                    new_g.member_no = replaced_g.member_no
-                    new_g._generation = self._generation + 1
+                if position >= pool_length:
+                    return
+                new_g = fitness_pool[position]
+                new_g.member_no = population[replaced_no].member_no
+                new_g._generation = next_generation
 
-                    #   update local bnf
-                    new_g.local_bnf['<member_no>'] = [new_g.member_no]
+                #   update local bnf
+                new_g.local_bnf['<member_no>'] = [new_g.member_no]
 
-                    self.population[new_g.member_no] = new_g
-                    position += 1
-                else:
-                    break
+                population[new_g.member_no] = new_g
+                position += 1
 
     def _continue_processing(self):
         """
         This function, using the criteria for ending the evolutionary process
         after each generation, returns a flag of whether to continue or not.
 
+        The target value, fitness type, and best value are each read once
+        per call; the best value requires a scan of the fitness list.  Log
+        messages are deferred to the logger so that nothing is built
+        unless a stop actually happens and logging is enabled.
+
         """
 
         status = True
@@ -948,39 +1341,135 @@ class GrammaticalEvolution(object):
         #   check max generations first
         if self.stopping_criteria[STOPPING_MAX_GEN] is not None:
             if self.stopping_criteria[STOPPING_MAX_GEN] <= self._generation:
-                logging.info("stopping processing due to max generation")
+                _logger.info("stopping processing due to max generation")
                 return False
 
+        target_value = fitl.get_target_value()
+        if target_value is not None or self._steady_generations is not None:
+            best_value = fitl.best_value()
+
         #   check target value
-        if fitl.get_target_value() is not None:
+        if target_value is not None:
             if fitl.get_fitness_type() == MAX:
-                if fitl.best_value() >= fitl.get_target_value():
-                    logging.info(' '.join([
-                    "stopping processing due to",
-                    "best value, %s, better than target value, %s" % (
-                    fitl.best_value(), fitl.get_target_value())]))
-                    return False
-            elif fitl.get_fitness_type() == MIN:
-                if fitl.best_value() <= fitl.get_target_value():
-                    logging.info(' '.join([
-                    "stopping processing due to",
-                    "best value, %s, better than target value, %s" % (
-                    fitl.best_value(), fitl.get_target_value())]))
-                    return False
-            elif fitl.get_fitness_type() == CENTER:
-                if fitl.best_value() <= fitl.get_target_value():
-                    logging.info(' '.join([
-                    "stopping processing due to",
-                    "best value, %s, better than target value, %s" % (
-                    fitl.best_value(), fitl.get_target_value())]))
-                    return False
+                reached = best_value >= target_value
+            else:
+                #   MIN and CENTER both seek the low side of the target
+                reached = best_value <= target_value
+
+            if reached:
+                _logger.info(
+                    "stopping processing due to best value, %s, better "
+                    "than target value, %s", best_value, target_value)
+                return False
+
+        #   check for a fitness plateau
+        if self._steady_generations is not None:
+            self._best_history.append(best_value)
+            if len(self._best_history) == self._steady_generations and \
+                    max(self._best_history) - min(self._best_history) <= \
+                        self._steady_epsilon:
+                _logger.info(
+                    "stopping processing due to no improvement in the "
+                    "best value over %s generations",
+                    self._steady_generations)
+                return False
 
         #   Finally check if there is a stopping function
         if self.stopping_criteria[STOPPING_FITNESS_LANDSCAPE] is not None:
             status = self.stopping_criteria[STOPPING_FITNESS_LANDSCAPE](
                                                         self.fitness_list)
-            logging.info(' '.join([
-                                "stopping processing due to",
-                                "fitness landscape being reached."]))
+            if not status:
+                _logger.info(
+                    "stopping processing due to fitness landscape "
+                    "being reached.")
 
         return status
+
+
+#   Worker-side references to the shared grammar, installed once per
+#   worker by _init_worker as the pool starts.
+_worker_bnf = None
+_worker_rule_table = None
+
+
+def _init_worker(bnf, rule_table):
+    """
+    This function runs once in each worker process as the pool starts.
+    It installs the shared grammar and rule table as module globals so
+    that they cross the process boundary a single time instead of
+    traveling with every genotype every generation.
+
+    """
+
+    global _worker_bnf, _worker_rule_table
+    _worker_bnf = bnf
+    _worker_rule_table = rule_table
+
+
+def _shrink_gene(gene, bnf):
+    """
+    This function strips the shared grammar out of a genotype before it
+    crosses a process boundary, keeping only the entries that the gene
+    has added or overridden.  The receiving side rebuilds the grammar
+    with _restore_gene.
+
+    """
+
+    overrides = {}
+    for key, value in gene.local_bnf.items():
+        if bnf.get(key) is not value:
+            overrides[key] = value
+    gene.local_bnf = overrides
+    gene._rule_table = None
+
+    return gene
+
+
+def _restore_gene(gene, bnf, rule_table):
+    """
+    This function rebuilds a genotype's grammar from the shared master
+    and the per-gene overrides left behind by _shrink_gene.  Overridden
+    rules are removed from a copy of the rule table, just as
+    set_bnf_variable would have done, so that resolution falls through
+    to the override.
+
+    """
+
+    overrides = gene.local_bnf
+    local_bnf = dict(bnf)
+    local_bnf.update(overrides)
+    gene.local_bnf = local_bnf
+
+    table = rule_table
+    for key in overrides:
+        if key in table:
+            if table is rule_table:
+                table = dict(rule_table)
+            del table[key]
+    gene._rule_table = table
+
+    return gene
+
+
+def _eval_gene(gene):
+    """
+    This function computes the fitness function for one genotype.  It runs
+    within a worker process and returns the genotype, because the gene is
+    modified as a byproduct of the evaluation -- the generated program, the
+    fitness value, and possibly an extended genotype.
+
+    When the worker holds the shared grammar, the gene arrives stripped
+    and is returned stripped, so only its own state is pickled each way.
+
+    """
+
+    if _worker_bnf is not None:
+        _restore_gene(gene, _worker_bnf, _worker_rule_table)
+
+    gene.starttime = _timer()
+    gene.compute_fitness()
+
+    if _worker_bnf is not None:
+        _shrink_gene(gene, _worker_bnf)
+
+    return gene
@@ -23,13 +23,107 @@ This module implements a layer class for an artficial neural network.
 
 """
 
+import numpy as np
+
 from pyneurgen.nodes import Node, CopyNode, BiasNode, Connection
+from pyneurgen.nodes import ACTIVATION_SIGMOID, ACTIVATION_TANH, \
+        ACTIVATION_LINEAR
 
 LAYER_TYPE_INPUT = 'input'
 LAYER_TYPE_HIDDEN = 'hidden'
 LAYER_TYPE_OUTPUT = 'output'
 
 
+def _sigmoid_batch(values):
+    """
+    This function calculates the sigmoid over an array of values.  Where
+    the scalar version traps an overflowing exp and returns 0.0, the
+    array version lets the overflow saturate to inf, which divides out
+    to the same 0.0.
+
+    """
+
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-values))
+
+
+def _linear_batch(values):
+    """
+    This function simply returns the array of values given to it.
+
+    """
+
+    return values
+
+
+def _sigmoid_derivative_batch(activations):
+    """
+    This function calculates the sigmoid derivative over an array of
+    already activated values, as the scalar version does per node.
+
+    """
+
+    return activations * (1.0 - activations)
+
+
+def _tanh_derivative_batch(activations):
+    """
+    This function calculates the tanh derivative over an array of
+    already activated values, as the scalar version does per node.
+
+    """
+
+    return 1.0 - np.tanh(activations) ** 2
+
+
+def _linear_derivative_batch(activations):
+    """
+    This function returns 1.0 for each of the values given to it.
+
+    """
+
+    return np.ones_like(activations)
+
+
+_BATCH_ACTIVATIONS = {
+    ACTIVATION_SIGMOID: _sigmoid_batch,
+    ACTIVATION_TANH: np.tanh,
+    ACTIVATION_LINEAR: _linear_batch}
+
+_BATCH_ERROR_FUNCS = {
+    ACTIVATION_SIGMOID: _sigmoid_derivative_batch,
+    ACTIVATION_TANH: _tanh_derivative_batch,
+    ACTIVATION_LINEAR: _linear_derivative_batch}
+
+
+def batch_activation(activation_type):
+    """
+    This function returns the array form of the activation function for
+    the activation type, suitable for applying to a whole batch of values
+    in one call.
+
+    """
+
+    try:
+        return _BATCH_ACTIVATIONS[activation_type]
+    except KeyError:
+        raise ValueError("invalid activation type: %s" % (activation_type))
+
+
+def batch_error_func(activation_type):
+    """
+    This function returns the array form of the error function, the
+    derivative matching the activation type, applied to already
+    activated values just as the per-node error functions are.
+
+    """
+
+    try:
+        return _BATCH_ERROR_FUNCS[activation_type]
+    except KeyError:
+        raise ValueError("invalid activation type: %s" % (activation_type))
+
+
 class Layer(object):
     """
     A layer comprises a list of nodes and behaviors appropriate for their
@@ -46,6 +140,8 @@ class Layer(object):
         """
         self.nodes = []
         self.layer_no = layer_no
+        self._node_index = {}
+        self._type_counts = {}
 
         if layer_type in [LAYER_TYPE_INPUT, LAYER_TYPE_HIDDEN,
                             LAYER_TYPE_OUTPUT]:
@@ -71,14 +167,13 @@ class Layer(object):
         This function returns the total nodes.  It can also return the total
         nodes of a particular type, such as 'copy'.
 
+        The per-type counts are maintained as nodes are added, so asking
+        for a type does not rescan the node list.
+
         """
 
-        count = 0
         if node_type:
-            for node in self.nodes:
-                if node.node_type == node_type:
-                    count += 1
-            return count
+            return self._type_counts.get(node_type, 0)
         else:
             return len(self.nodes)
 
@@ -158,6 +253,9 @@ class Layer(object):
                 node.set_activation_type(self.default_activation_type)
         node.layer = self
         self.nodes.append(node)
+        self._node_index[node.node_no] = node
+        self._type_counts[node.node_type] = \
+                self._type_counts.get(node.node_type, 0) + 1
 
     def get_node(self, node_no):
         """
@@ -167,13 +265,19 @@ class Layer(object):
         there might be a mis-match between node_no and position within the
         list.
 
+        The lookup uses a dict index keyed by node_no.  Since node numbers
+        can be renumbered externally for sparse networks, a stale entry
+        causes the index to be rebuilt from the node list before giving up.
+
         """
 
-        for node in self.nodes:
-            if node.node_no == node_no:
-                return node
+        node = self._node_index.get(node_no)
+        if node is not None and node.node_no == node_no:
+            return node
+
+        self._node_index = dict((node.node_no, node) for node in self.nodes)
 
-        return False
+        return self._node_index.get(node_no, False)
 
     def get_nodes(self, node_type=None):
         """
@@ -209,27 +313,34 @@ class Layer(object):
         This takes a list of inputs that applied sequentially to
         each node in the input_layer
 
+        The values are converted to floats in one pass up front, which
+        validates them without a per-element type check in the loop.
+
         """
 
         if self.layer_type != LAYER_TYPE_INPUT:
             raise ValueError("inputs are only entered into the input layer")
 
-        for i in range(len(inputs)):
-            node = self.nodes[i]
+        try:
+            values = [float(value) for value in inputs]
+        except (TypeError, ValueError):
+            raise ValueError(
+                "Invalid values, must be floats: %s" % (inputs,))
+
+        for node, value in zip(self.nodes, values):
             if node.node_type != LAYER_TYPE_INPUT:
                 raise ValueError(
                     "Attempting to load an input value into a non-input node")
-            if isinstance(inputs[i], float):
-                node.set_value(inputs[i])
-            else:
-                raise ValueError(
-                    "Invalid value, most be float: %s" % (inputs[i]))
+            node.set_value(value)
 
     def load_targets(self, targets):
         """
         This takes a list of targets that applied sequentially to
         each node in the output_layer
 
+        The values are converted to floats in one pass up front, which
+        validates them without a per-element type check in the loop.
+
         """
 
         if self.layer_type != LAYER_TYPE_OUTPUT:
@@ -240,15 +351,16 @@ class Layer(object):
             raise ValueError(
                 "Number of targets: %s, Number of nodes: %s""" % (
                     (len(targets), len(self.nodes))))
-        for i in range(self.total_nodes()):
-            node = self.nodes[i]
-            if isinstance(targets[i], float):
-                node.set_value(targets[i])
-            else:
-                raise ValueError(
-                    "Invalid value, most be float: %s" % (targets[i]))
-            node = self.nodes[i]
-            node.target = targets[i]
+
+        try:
+            values = [float(value) for value in targets]
+        except (TypeError, ValueError):
+            raise ValueError(
+                "Invalid values, must be floats: %s" % (targets,))
+
+        for node, value in zip(self.nodes, values):
+            node.set_value(value)
+            node.target = value
 
     def randomize(self, random_constraint):
         """
@@ -262,14 +374,84 @@ class Layer(object):
 
     def feed_forward(self):
         """
-        This function loops through the nodes on the layer and causes each
-        node to feedforward values from nodes below that node.
+        This function feeds values forward from the nodes below into the
+        nodes on this layer.
+
+        When every node draws upon the same lower nodes in the same order,
+        as layers built with connect_layer do, the weighted sums are
+        computed as one matrix product, and each lower node activates once
+        for the whole layer rather than once per connection.  Sparse or
+        hand-wired layers fall back to node-by-node feed forward.
 
         """
 
-        for node in self.nodes:
-            if not isinstance(node, BiasNode):
-                node.feed_forward()
+        live_nodes = [node for node in self.nodes
+                            if not isinstance(node, BiasNode)]
+        if not live_nodes:
+            return
+
+        base_conns = live_nodes[0].input_connections
+        for node in live_nodes:
+            conns = node.input_connections
+            if len(conns) != len(base_conns):
+                break
+            if not all(conn.lower_node is base.lower_node
+                        for conn, base in zip(conns, base_conns)):
+                break
+        else:
+            if base_conns:
+                for conn in base_conns:
+                    if conn.lower_node.get_value() is None:
+                        raise ValueError("Uninitialized node %s" % (
+                                    conn.lower_node.node_no))
+
+                activations = np.array(
+                    [conn.lower_node.activate() for conn in base_conns])
+                weights = np.array(
+                    [[conn.get_weight() for conn in node.input_connections]
+                        for node in live_nodes])
+                for node, value in zip(live_nodes,
+                                        weights.dot(activations)):
+                    node.set_value(float(value))
+                return
+
+        for node in live_nodes:
+            node.feed_forward()
+
+    def feed_forward_batch(self, lower_layer, lower_activations):
+        """
+        This function is the batched counterpart of feed_forward.  It
+        accepts the layer below along with a 2-d array of that layer's
+        activations, one row per sample and one column per lower node,
+        and returns the activations of this layer in the same form.  Bias
+        node columns are held at 1.0.
+
+        Each node computes its weighted sums for the whole batch in one
+        matrix operation, so no node values are touched along the way.
+        That makes this form suited to evaluating a trained network, not
+        to learning, which adjusts weights sample by sample.
+
+        """
+
+        lower_positions = {}
+        for position, node in enumerate(lower_layer.nodes):
+            lower_positions[id(node)] = position
+
+        samples = lower_activations.shape[0]
+        activations = np.ones((samples, len(self.nodes)))
+        for position, node in enumerate(self.nodes):
+            if isinstance(node, BiasNode):
+                continue
+
+            columns = [lower_positions[id(conn.lower_node)]
+                            for conn in node.input_connections]
+            weights = np.array([conn.get_weight()
+                            for conn in node.input_connections])
+            values = lower_activations[:, columns].dot(weights)
+            activations[:, position] = batch_activation(
+                    node.get_activation_type())(values)
+
+        return activations
 
     def update_error(self, halt_on_extremes):
         """
@@ -292,6 +474,22 @@ class Layer(object):
             if node.node_type != 'bias':
                 node.adjust_weights(learnrate, halt_on_extremes)
 
+    def backward(self, learnrate, halt_on_extremes):
+        """
+        This function performs the layer's share of the backward pass in
+        one walk of the nodes:  each node updates its error from above,
+        pushes its share of the error down to the nodes below, and then
+        adjusts its incoming weights while the error and connections are
+        at hand.  It fuses what update_error and adjust_weights do in
+        separate passes, touching each node and its connections once.
+
+        """
+
+        for node in self.nodes:
+            node.update_error(halt_on_extremes)
+            if node.node_type != 'bias':
+                node.adjust_weights(learnrate, halt_on_extremes)
+
     def get_errors(self):
         """
         This function returns a list of the error with each node.
@@ -306,10 +504,7 @@ class Layer(object):
         each node in the layer.
 
         """
-        weights = []
-
-        for node in self.nodes:
-            for conn in node.input_connections:
-                weights.append(conn.get_weight())
 
-        return weights
+        return [conn.get_weight()
+                    for node in self.nodes
+                        for conn in node.input_connections]
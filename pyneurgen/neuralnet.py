@@ -21,15 +21,601 @@
 This module implements the components for an artficial neural network.
 
 """
+import json
 import math
+import re
+from multiprocessing import Pool
 from random import random
-import ConfigParser
+try:
+    import ConfigParser
+except ImportError:
+    #   Python 3
+    import configparser as ConfigParser
 
-from pyneurgen.layers import Layer
+import numpy as np
+
+from pyneurgen.layers import Layer, batch_activation, batch_error_func
 from pyneurgen.nodes import Node, CopyNode, BiasNode, Connection
 from pyneurgen.nodes import NODE_OUTPUT, NODE_HIDDEN, NODE_INPUT, NODE_COPY
 from pyneurgen.nodes import NODE_BIAS
 
+#   Node id format used in saved files: 'node-%s:%s' % (layer_no, node_no)
+_NODE_ID_RE = re.compile(r'node-(\d+):(\d+)')
+
+
+class _IrregularNetwork(Exception):
+    """
+    This exception signals that a network's wiring does not fit the dense
+    array form, so the node-by-node path must be used instead.
+
+    """
+
+
+class _ArrayNetwork(object):
+    """
+    This class shadows a fully connected network with structure-of-arrays
+    state:  one weight matrix, one value vector, one activation vector,
+    and one error vector per layer.  The learning and evaluation loops
+    can then process each sample with a couple of matrix operations per
+    layer instead of walking the node and connection objects, and the
+    results are written back to the objects when the run completes.
+
+    The nodes and connections remain the authoritative store between
+    runs; the arrays are rebuilt from them on each build.  Networks with
+    sparse or hand-wired connections do not fit this form and continue
+    to use the node-by-node path.
+
+    """
+
+    def __init__(self, net, dtype=np.float64):
+        """
+        This function gathers the arrays from the network's layers,
+        raising _IrregularNetwork wherever the wiring steps outside the
+        dense form that the array math assumes.  Evaluation may pass
+        np.float32 to halve the bytes moved per sample.
+
+        """
+
+        self._net = net
+        self._layers = net.layers
+        self._dtype = dtype
+        self._values = []
+        self._activations = []
+        self._errors = []
+        self._live = []
+        self._bias_positions = []
+        self._act_groups = []
+        self._error_groups = []
+        self._weights = [None]
+        self._conn_rows = [None]
+        self._input_positions = None
+        self._targets = None
+
+        node_positions = {}
+        for layer_no, layer in enumerate(self._layers):
+            for position, node in enumerate(layer.nodes):
+                node_positions[id(node)] = (layer_no, position)
+
+        for layer_no, layer in enumerate(self._layers):
+            nodes = layer.nodes
+            count = len(nodes)
+            if count == 0:
+                raise _IrregularNetwork
+
+            values = np.zeros(count, dtype=dtype)
+            live = np.ones(count, dtype=dtype)
+            bias_positions = []
+            type_positions = {}
+            for position, node in enumerate(nodes):
+                if isinstance(node, BiasNode):
+                    values[position] = 1.0
+                    live[position] = 0.0
+                    bias_positions.append(position)
+                    continue
+                value = node.get_value()
+                values[position] = 0.0 if value is None else value
+                type_positions.setdefault(
+                    node.get_activation_type(), []).append(position)
+
+            act_groups = []
+            error_groups = []
+            for activation_type, positions in type_positions.items():
+                try:
+                    act = batch_activation(activation_type)
+                    error_func = batch_error_func(activation_type)
+                except ValueError:
+                    raise _IrregularNetwork
+                positions = np.array(positions, dtype=np.int64)
+                act_groups.append((positions, act))
+                error_groups.append((positions, error_func))
+
+            self._values.append(values)
+            self._activations.append(np.ones(count, dtype=dtype))
+            self._errors.append(np.zeros(count, dtype=dtype))
+            self._live.append(live)
+            self._bias_positions.append(
+                np.array(bias_positions, dtype=np.int64))
+            self._act_groups.append(act_groups)
+            self._error_groups.append(error_groups)
+            self._activate_layer(layer_no)
+
+            if layer_no == 0:
+                self._input_positions = np.array(
+                    [position for position, node in enumerate(nodes)
+                        if node.node_type == NODE_INPUT], dtype=np.int64)
+                continue
+
+            lower_nodes = self._layers[layer_no - 1].nodes
+            lower_count = len(lower_nodes)
+            weights = np.zeros((count, lower_count), dtype=dtype)
+            conn_rows = []
+            for position, node in enumerate(nodes):
+                if isinstance(node, BiasNode):
+                    conn_rows.append(None)
+                    continue
+                conns = node.input_connections
+                if len(conns) != lower_count:
+                    raise _IrregularNetwork
+                for i, conn in enumerate(conns):
+                    if conn.lower_node is not lower_nodes[i]:
+                        raise _IrregularNetwork
+                    weights[position, i] = conn.get_weight()
+                conn_rows.append(conns)
+            self._weights.append(weights)
+            self._conn_rows.append(conn_rows)
+
+        #   The copy specs are gathered in the order _copy_levels uses:
+        #   layers from the bottom up, nodes from the highest position
+        #   down, so copies of copies resolve identically.
+        self._copy_specs = []
+        for layer_no, layer in enumerate(self._layers):
+            for position in range(len(layer.nodes) - 1, -1, -1):
+                node = layer.nodes[position]
+                if not isinstance(node, CopyNode):
+                    continue
+                source = node.get_source_node()
+                if source is None or id(source) not in node_positions:
+                    raise _IrregularNetwork
+                if node.get_source_type() not in ('a', 'v'):
+                    raise _IrregularNetwork
+                self._copy_specs.append((
+                    layer_no, position,
+                    node_positions[id(source)],
+                    node.get_source_type(),
+                    node.get_incoming_weight(),
+                    node.get_existing_weight(),
+                    node._activate,
+                    node.get_activation_type()))
+        self._copy_plan = self._build_copy_plan()
+
+    @classmethod
+    def build(cls, net, dtype=np.float64):
+        """
+        This function returns an array engine for the network, or None
+        when the network's wiring does not fit the dense array form.
+
+        """
+
+        if not net.layers:
+            return None
+        try:
+            return cls(net, dtype)
+        except _IrregularNetwork:
+            return None
+
+    def _activate_layer(self, layer_no):
+        """
+        This function applies the activation functions to the layer's
+        values by activation-type group.  Bias positions stay at 1.0.
+
+        """
+
+        values = self._values[layer_no]
+        activations = self._activations[layer_no]
+        for positions, act in self._act_groups[layer_no]:
+            activations[positions] = act(values[positions])
+
+    def process_sample(self, inputs, targets, learn, learnrate,
+                            halt_on_extremes):
+        """
+        This function runs one sample through the arrays:  loads the
+        inputs, feeds forward, backpropagates when learning, and
+        advances the copy node values.  It returns the summed squared
+        error of the output layer when targets are given, else 0.0.
+
+        """
+
+        positions = self._input_positions
+        if len(inputs) > len(positions):
+            raise ValueError(
+                "Attempting to load an input value into a non-input node")
+        try:
+            values = [float(value) for value in inputs]
+        except (TypeError, ValueError):
+            raise ValueError(
+                "Invalid values, must be floats: %s" % (inputs,))
+
+        self._values[0][positions[:len(values)]] = values
+        self._activate_layer(0)
+
+        for layer_no in range(1, len(self._layers)):
+            layer_values = self._weights[layer_no].dot(
+                    self._activations[layer_no - 1])
+            layer_values[self._bias_positions[layer_no]] = 1.0
+            self._values[layer_no] = layer_values
+            self._activate_layer(layer_no)
+
+        if targets:
+            output_count = len(self._values[-1])
+            if len(targets) != output_count:
+                raise ValueError(
+                    "Number of targets: %s, Number of nodes: %s""" % (
+                        (len(targets), output_count)))
+            try:
+                target_values = np.array(
+                    [float(value) for value in targets],
+                    dtype=self._dtype)
+            except (TypeError, ValueError):
+                raise ValueError(
+                    "Invalid values, must be floats: %s" % (targets,))
+
+            self._targets = target_values
+            self._errors[-1] = target_values - self._activations[-1]
+            if learn:
+                self._back_propagate(learnrate, halt_on_extremes)
+
+        self._copy_levels()
+
+        if targets:
+            return float(np.sum(self._errors[-1] ** 2))
+        return 0.0
+
+    def _back_propagate(self, learnrate, halt_on_extremes):
+        """
+        This function mirrors the fused backward pass on the arrays.
+        For each layer from the top down, the layer's error is pushed to
+        the layer below through the pre-update weights, the weights take
+        the learning-rate adjustment, and the pushed error picks up the
+        activation derivative to become the lower layer's error.
+
+        """
+
+        error = self._errors[-1]
+        for layer_no in range(len(self._layers) - 1, 0, -1):
+            self._errors[layer_no] = error
+            if halt_on_extremes and np.isnan(error).any():
+                raise ValueError("Error term has become Nan.")
+
+            weights = self._weights[layer_no]
+            lower_error = weights.T.dot(error)
+            if halt_on_extremes and np.isnan(lower_error).any():
+                raise ValueError("Error term has become Nan.")
+
+            #   Bias nodes have no incoming connections to adjust.
+            weights += learnrate * np.outer(
+                    error * self._live[layer_no],
+                    self._activations[layer_no - 1])
+            if halt_on_extremes and np.isnan(weights).any():
+                raise ValueError("Weight term has become Nan.")
+
+            error = lower_error
+            for positions, error_func in self._error_groups[layer_no - 1]:
+                error[positions] *= error_func(
+                        self._activations[layer_no - 1][positions])
+
+        self._errors[0] = error
+
+    def _build_copy_plan(self):
+        """
+        This function turns the copy specs into per-layer index arrays
+        so that _copy_levels can advance all of a layer's copy nodes
+        with a few gather/scatter statements instead of one Python
+        iteration per node.  It returns None when the wiring needs the
+        strict node-by-node ordering:  a copy node sourcing a
+        higher-positioned copy node on its own layer would read that
+        node's advanced value, which a snapshot gather cannot see.
+
+        """
+
+        if not self._copy_specs:
+            return []
+
+        destinations = set(
+            (spec[0], spec[1]) for spec in self._copy_specs)
+        for spec in self._copy_specs:
+            layer_no, position = spec[0], spec[1]
+            src_layer, src_position = spec[2]
+            if (src_layer, src_position) in destinations and \
+                    src_layer == layer_no and src_position > position:
+                return None
+
+        gathers = {}
+        act_positions = {}
+        for (layer_no, position, (src_layer, src_position), source_type,
+                incoming_weight, existing_weight, activate,
+                activation_type) in self._copy_specs:
+            key = (layer_no, src_layer, source_type)
+            gathers.setdefault(key, []).append(
+                (position, src_position, incoming_weight, existing_weight))
+            act_positions.setdefault(
+                (layer_no, batch_activation(activation_type)),
+                []).append(position)
+
+        plan = {}
+        for (layer_no, src_layer, source_type), rows in gathers.items():
+            steps = plan.setdefault(layer_no, ([], []))
+            steps[0].append((
+                np.array([row[0] for row in rows], dtype=np.int64),
+                src_layer,
+                np.array([row[1] for row in rows], dtype=np.int64),
+                source_type,
+                np.array([row[2] for row in rows]),
+                np.array([row[3] for row in rows])))
+        for (layer_no, act), positions in act_positions.items():
+            plan.setdefault(layer_no, ([], []))[1].append(
+                (np.array(positions, dtype=np.int64), act))
+
+        return [(layer_no,) + plan[layer_no]
+                    for layer_no in sorted(plan)]
+
+    def _copy_levels(self):
+        """
+        This function advances the copy node values on the arrays, in
+        the same order that NeuralNet._copy_levels walks the nodes.
+        When the copy plan applies, each layer's copy nodes advance
+        together from a snapshot of the layer's prior state; otherwise
+        the specs are walked one node at a time.
+
+        """
+
+        if self._copy_plan is not None:
+            for layer_no, gather_steps, act_steps in self._copy_plan:
+                values = self._values[layer_no]
+                prior_values = values.copy()
+                prior_activations = self._activations[layer_no].copy()
+                for (dst, src_layer, src, source_type, incoming,
+                        existing) in gather_steps:
+                    if src_layer == layer_no:
+                        source = prior_activations if source_type == 'a' \
+                                    else prior_values
+                    elif source_type == 'a':
+                        source = self._activations[src_layer]
+                    else:
+                        source = self._values[src_layer]
+                    values[dst] = prior_values[dst] * existing + \
+                                    source[src] * incoming
+                for dst, act in act_steps:
+                    self._activations[layer_no][dst] = act(values[dst])
+            return
+
+        for (layer_no, position, (src_layer, src_position), source_type,
+                incoming_weight, existing_weight, activate,
+                _activation_type) in self._copy_specs:
+            if source_type == 'a':
+                value = self._activations[src_layer][src_position]
+            else:
+                value = self._values[src_layer][src_position]
+
+            value = self._values[layer_no][position] * existing_weight + \
+                        value * incoming_weight
+            self._values[layer_no][position] = value
+            self._activations[layer_no][position] = activate(value)
+
+    def learn_batch(self, input_rows, target_rows, learnrate,
+                        halt_on_extremes):
+        """
+        This function feeds a mini-batch of samples forward together and
+        applies one weight update per layer from the batch-averaged
+        gradients, turning a run of matrix-vector products into a few
+        matrix-matrix products.  It returns the summed squared output
+        error over the batch.
+
+        Note that this changes the learning dynamics from classic
+        per-sample updating:  the whole batch sees the same weights.
+        Networks with copy nodes cannot learn this way, because copy
+        nodes carry values from one sample into the next.
+
+        """
+
+        samples = len(input_rows)
+        positions = self._input_positions
+        try:
+            inputs = np.array([[float(value) for value in row]
+                                    for row in input_rows])
+            targets = np.array([[float(value) for value in row]
+                                    for row in target_rows])
+        except (TypeError, ValueError):
+            raise ValueError(
+                "Invalid values, must be floats: %s" % (input_rows,))
+
+        if inputs.ndim != 2 or inputs.shape[1] != positions.size:
+            raise ValueError(
+                "Each input row must hold one value per input node")
+        if targets.ndim != 2 or targets.shape[1] != len(self._values[-1]):
+            raise ValueError(
+                "Each target row must hold one value per output node")
+
+        values = np.ones((samples, len(self._values[0])))
+        values[:, positions] = inputs
+        activations = np.ones_like(values)
+        for group_positions, act in self._act_groups[0]:
+            activations[:, group_positions] = act(
+                    values[:, group_positions])
+
+        layer_values = [values]
+        layer_activations = [activations]
+        for layer_no in range(1, len(self._layers)):
+            values = layer_activations[-1].dot(
+                    self._weights[layer_no].T)
+            values[:, self._bias_positions[layer_no]] = 1.0
+            activations = np.ones_like(values)
+            for group_positions, act in self._act_groups[layer_no]:
+                activations[:, group_positions] = act(
+                        values[:, group_positions])
+            layer_values.append(values)
+            layer_activations.append(activations)
+
+        error = targets - layer_activations[-1]
+        summed_errors = float(np.sum(error ** 2))
+
+        layer_errors = [None] * len(self._layers)
+        for layer_no in range(len(self._layers) - 1, 0, -1):
+            layer_errors[layer_no] = error
+            if halt_on_extremes and np.isnan(error).any():
+                raise ValueError("Error term has become Nan.")
+
+            weights = self._weights[layer_no]
+            lower_error = error.dot(weights)
+            if halt_on_extremes and np.isnan(lower_error).any():
+                raise ValueError("Error term has become Nan.")
+
+            weights += (learnrate / float(samples)) * \
+                    (error * self._live[layer_no]).T.dot(
+                        layer_activations[layer_no - 1])
+            if halt_on_extremes and np.isnan(weights).any():
+                raise ValueError("Weight term has become Nan.")
+
+            error = lower_error
+            for group_positions, error_func in \
+                    self._error_groups[layer_no - 1]:
+                error[:, group_positions] *= error_func(
+                        layer_activations[layer_no - 1][:, group_positions])
+        layer_errors[0] = error
+
+        #   The last sample's state is kept so that write_back and any
+        #   inspection see the same thing per-sample processing leaves.
+        for layer_no in range(len(self._layers)):
+            self._values[layer_no] = layer_values[layer_no][-1].copy()
+            self._activations[layer_no] = \
+                    layer_activations[layer_no][-1].copy()
+            self._errors[layer_no] = layer_errors[layer_no][-1].copy()
+        self._targets = targets[-1].copy()
+
+        return summed_errors
+
+    def export_state(self):
+        """
+        This function returns a picklable snapshot of the arrays, for
+        shipping the engine to worker processes.  The nodes and
+        connections stay behind; a worker only needs the math.
+
+        """
+
+        return {
+            'layer_count': len(self._layers),
+            'dtype': self._dtype,
+            'values': self._values,
+            'activations': self._activations,
+            'errors': self._errors,
+            'live': self._live,
+            'bias_positions': self._bias_positions,
+            'act_groups': self._act_groups,
+            'error_groups': self._error_groups,
+            'weights': self._weights,
+            'input_positions': self._input_positions}
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        This function rebuilds an engine from an exported state.  Such
+        an engine can process samples but has no network to write back
+        to, and carries no copy nodes -- the parallel path that uses
+        it excludes them.
+
+        """
+
+        engine = object.__new__(cls)
+        engine._net = None
+        engine._layers = [None] * state['layer_count']
+        engine._dtype = state['dtype']
+        engine._values = [np.array(values) for values in state['values']]
+        engine._activations = [np.array(activations)
+                                for activations in state['activations']]
+        engine._errors = [np.array(errors) for errors in state['errors']]
+        engine._live = state['live']
+        engine._bias_positions = state['bias_positions']
+        engine._act_groups = state['act_groups']
+        engine._error_groups = state['error_groups']
+        engine._weights = [None] + [np.array(weights)
+                                for weights in state['weights'][1:]]
+        engine._input_positions = state['input_positions']
+        engine._conn_rows = None
+        engine._targets = None
+        engine._copy_specs = []
+        engine._copy_plan = []
+
+        return engine
+
+    def output_activations(self):
+        """
+        This function returns the activations of the output layer for
+        the most recent sample as a list of floats.
+
+        """
+
+        return [float(value) for value in self._activations[-1]]
+
+    def write_back(self):
+        """
+        This function writes the array state back to the nodes and
+        connections -- weights, values, errors, and output targets -- so
+        that the object form reflects the completed run.
+
+        """
+
+        #   Weights are written back only at full precision; a
+        #   single-precision evaluation run must not round the stored
+        #   double-precision weights, which it never modifies anyway.
+        write_weights = self._dtype == np.float64
+        for layer_no, layer in enumerate(self._layers):
+            values = self._values[layer_no]
+            errors = self._errors[layer_no]
+            for position, node in enumerate(layer.nodes):
+                node.error = float(errors[position])
+                if not isinstance(node, BiasNode):
+                    node._value = float(values[position])
+                    node._activated = None
+
+            if layer_no == 0 or not write_weights:
+                continue
+            weights = self._weights[layer_no]
+            for position, conns in enumerate(self._conn_rows[layer_no]):
+                if conns is None:
+                    continue
+                row = weights[position]
+                for i, conn in enumerate(conns):
+                    conn.set_weight(float(row[i]))
+
+        if self._targets is not None:
+            for position, node in enumerate(self._net.output_layer.nodes):
+                node.target = float(self._targets[position])
+
+
+def _learn_shard(args):
+    """
+    This function runs one shard of an epoch's samples on an engine
+    rebuilt from exported state, and returns the per-layer weight
+    deltas along with the summed squared error.  It runs in a worker
+    process.
+
+    """
+
+    state, samples, learnrate, halt_on_extremes = args
+    engine = _ArrayNetwork.from_state(state)
+    start_weights = [None] + [weights.copy()
+                                for weights in engine._weights[1:]]
+
+    summed_errors = 0.0
+    for inputs, targets in samples:
+        summed_errors += engine.process_sample(
+            inputs, targets, True, learnrate, halt_on_extremes)
+
+    deltas = [None] + [
+        engine._weights[layer_no] - start_weights[layer_no]
+            for layer_no in range(1, len(engine._weights))]
+
+    return (deltas, summed_errors)
+
 
 class NeuralNet(object):
     """
@@ -46,6 +632,9 @@ class NeuralNet(object):
         self._learnrate = .1
         self._random_constraint = 1.0
         self._epochs = 1
+        self._batch_size = 1
+        self._max_workers = 1
+        self._inference_precision = 'double'
         self.layers = []
         self._data_range = {'learning': [None, None],
                             'validation': [None, None],
@@ -204,6 +793,94 @@ class NeuralNet(object):
 
         return self._epochs
 
+    def set_batch_size(self, batch_size):
+        """
+        This function sets the number of samples that are fed through the
+        network per weight update during learning.  The default of 1 keeps
+        the classic per-sample updating.  With a larger batch size, the
+        samples in each batch all see the same weights and one averaged
+        adjustment is applied per batch.  Recurrent networks with copy
+        nodes always learn per sample, since copy nodes carry values from
+        one sample into the next.
+
+        """
+
+        err_msg = """The batch size, %s, must be an int greater than or
+                  equal to 1.""" % (batch_size)
+        if not isinstance(batch_size, int):
+            raise ValueError(err_msg)
+        elif batch_size < 1:
+            raise ValueError(err_msg)
+        else:
+            self._batch_size = batch_size
+
+    def get_batch_size(self):
+        """
+        This function gets the number of samples per weight update used
+        during learning.
+
+        """
+
+        return self._batch_size
+
+    def set_max_workers(self, max_workers):
+        """
+        This function sets the number of worker processes used during
+        learning.  The default of 1 learns serially.  With more
+        workers, each epoch's samples are split into shards that learn
+        on copies of the weights in parallel, and the resulting weight
+        changes are averaged into the network once per epoch.  As with
+        mini-batches, this changes the learning dynamics from strict
+        per-sample updating, and recurrent networks with copy nodes
+        always learn serially.
+
+        """
+
+        err_msg = """The max workers, %s, must be an int greater than or
+                  equal to 1.""" % (max_workers)
+        if not isinstance(max_workers, int):
+            raise ValueError(err_msg)
+        elif max_workers < 1:
+            raise ValueError(err_msg)
+        else:
+            self._max_workers = max_workers
+
+    def get_max_workers(self):
+        """
+        This function gets the number of worker processes used during
+        learning.
+
+        """
+
+        return self._max_workers
+
+    def set_inference_precision(self, precision):
+        """
+        This function sets the floating point precision used when
+        evaluating with test() and validate().  'double' is the default
+        and matches learning exactly.  'single' halves the bytes moved
+        per sample, which can speed up evaluation of larger networks at
+        the cost of roundoff in the seventh decimal place or so.
+        Learning always runs in double precision.
+
+        """
+
+        err_msg = """The inference precision, %s, must be either 'single'
+                  or 'double'.""" % (precision)
+        if precision not in ('single', 'double'):
+            raise ValueError(err_msg)
+        else:
+            self._inference_precision = precision
+
+    def get_inference_precision(self):
+        """
+        This function gets the floating point precision used when
+        evaluating with test() and validate().
+
+        """
+
+        return self._inference_precision
+
     def set_time_delay(self, time_delay):
         """
         This function sets a value for time delayed data.  For example, is the
@@ -389,11 +1066,15 @@ class NeuralNet(object):
             raise ValueError(
                 "end_position %s is past end of ._allinputs, %s" % (
                     end_position, len(self._allinputs)))
+        tdly = self.get_time_delay()
+        if tdly > 0:
+            #   The time-delay windows overlap by tdly values, so the
+            #   first elements are pulled out once here and each sample
+            #   takes a plain slice instead of rebuilding its window.
+            input_values = [item[0] for item in self._allinputs]
         while i < end_position:
-            tdly = self.get_time_delay()
             if tdly > 0:
-                start = i - tdly
-                inputs = [item[0] for item in self._allinputs[start:i + 1]]
+                inputs = input_values[i - tdly:i + 1]
             else:
                 inputs = self._allinputs[i]
 
@@ -411,13 +1092,9 @@ class NeuralNet(object):
 
         """
 
-        for i in xrange(start_position, end_position):
-            order = [[random(), i]
-                for i in xrange(start_position, end_position)]
-
-        order.sort()
-        for item in order:
-            yield item[1]
+        for position in np.random.permutation(
+                end_position - start_position):
+            yield start_position + int(position)
 
     def _check_positions(self, start_position, end_position):
         """
@@ -545,19 +1222,64 @@ class NeuralNet(object):
         if epochs is not None:
             self.set_epochs(epochs)
 
+        #   A densely connected network learns on the array engine; a
+        #   hand-wired one keeps the node-by-node path.
+        engine = _ArrayNetwork.build(self)
+        halt_on_extremes = self.get_halt_on_extremes()
+
+        #   Mini-batch learning needs the array engine and cannot be used
+        #   with copy nodes, which carry values from sample to sample.
+        use_batches = (self._batch_size > 1 and engine is not None and
+                        not engine._copy_specs)
+
+        #   Parallel learning shards each epoch across worker processes
+        #   under the same conditions; mini-batching takes precedence
+        #   when both are requested.
+        use_workers = (self._max_workers > 1 and not use_batches and
+                        engine is not None and not engine._copy_specs)
+        pool = None
+        if use_workers:
+            pool = Pool(processes=self._max_workers)
+
         self.accum_mse = []
         for epoch in range(self._epochs):
+            if use_workers:
+                summed_errors, count = self._learn_epoch_parallel(
+                        pool, engine, random_testing, halt_on_extremes)
+                mse = self.calc_mse(summed_errors, count)
+                if show_epoch_results:
+                    print ("epoch: %s MSE: %s" % (epoch, mse))
+                self.accum_mse.append(mse)
+                continue
             summed_errors = 0.0
             count = 0
+            batch_inputs = []
+            batch_targets = []
             for inputs, targets in self.get_learn_data(random_testing):
-                self.process_sample(inputs, targets, learn=True)
-                summed_errors += self.calc_sample_error()
+                if use_batches:
+                    batch_inputs.append(inputs)
+                    batch_targets.append(targets)
+                    if len(batch_inputs) == self._batch_size:
+                        summed_errors += engine.learn_batch(batch_inputs,
+                                batch_targets, self._learnrate,
+                                halt_on_extremes)
+                        batch_inputs = []
+                        batch_targets = []
+                elif engine is not None:
+                    summed_errors += engine.process_sample(inputs, targets,
+                            True, self._learnrate, halt_on_extremes)
+                else:
+                    self.process_sample(inputs, targets, learn=True)
+                    summed_errors += self.calc_sample_error()
                 count += 1
                 if show_sample_interval > 0:
                     if count % show_sample_interval == 0:
                         #   Convert to logging at some point
                         print ("epoch %s of %s, sample: %s errors: %s" % (
                             epoch, self._epochs, count, summed_errors))
+            if batch_inputs:
+                summed_errors += engine.learn_batch(batch_inputs,
+                        batch_targets, self._learnrate, halt_on_extremes)
 
             mse = self.calc_mse(summed_errors, count)
             if show_epoch_results:
@@ -566,6 +1288,46 @@ class NeuralNet(object):
 
             self.accum_mse.append(mse)
 
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+        if engine is not None:
+            engine.write_back()
+
+    def _learn_epoch_parallel(self, pool, engine, random_testing,
+                                halt_on_extremes):
+        """
+        This function learns one epoch across the worker pool.  The
+        epoch's samples are split into one shard per worker, each shard
+        learns on its own copy of the weights, and the weight changes
+        are averaged back into the engine.  It returns the summed
+        squared errors and the sample count.
+
+        """
+
+        samples = list(self.get_learn_data(random_testing))
+        if not samples:
+            return (0.0, 0)
+
+        workers = min(self._max_workers, len(samples))
+        shard_size = (len(samples) + workers - 1) // workers
+        shards = [samples[start:start + shard_size]
+                    for start in range(0, len(samples), shard_size)]
+        state = engine.export_state()
+
+        results = pool.map(_learn_shard,
+            [(state, shard, self._learnrate, halt_on_extremes)
+                for shard in shards])
+
+        for layer_no in range(1, len(self.layers)):
+            total = results[0][0][layer_no].copy()
+            for deltas, _summed in results[1:]:
+                total += deltas[layer_no]
+            engine._weights[layer_no] += total / len(results)
+
+        return (sum(summed for _deltas, summed in results), len(samples))
+
     def validate(self, show_sample_interval=0):
         """
         This function loads and feedforwards the network with validation data.
@@ -596,22 +1358,59 @@ class NeuralNet(object):
             #   test data
             eval_list = self.test_targets_activations = []
             get_data = self.get_test_data
+            data_range = self._data_range['test']
         elif eval_type == 'v':
             eval_list = self.validation_targets_activations = []
             get_data = self.get_validation_data
+            data_range = self._data_range['validation']
+        dtype = np.float32 if self._inference_precision == 'single' \
+                    else np.float64
+        engine = _ArrayNetwork.build(self, dtype)
+
+        #   The targets and activations are collected in preallocated
+        #   arrays rather than appended pair by pair.  The data range
+        #   sizes the arrays; an overridden data generator that yields
+        #   more samples just grows them.
+        output_count = len(self.output_layer.nodes)
+        capacity = 1
+        if data_range[0] is not None and data_range[1] is not None:
+            capacity = max(data_range[1] - data_range[0], 1)
+        targets_arr = np.empty((capacity, output_count))
+        actuals_arr = np.empty((capacity, output_count))
+
         summed_errors = 0.0
         count = 0
         for inputs, targets in get_data():
-            self.process_sample(inputs, targets, learn=False)
-            summed_errors += self.calc_sample_error()
+            if engine is not None:
+                summed_errors += engine.process_sample(inputs, targets,
+                        False, self._learnrate, False)
+                activations = engine.output_activations()
+            else:
+                self.process_sample(inputs, targets, learn=False)
+                activations = self.output_layer.activations()
+                summed_errors += self.calc_sample_error()
+            if count == capacity:
+                capacity *= 2
+                targets_arr = np.resize(targets_arr,
+                                (capacity, output_count))
+                actuals_arr = np.resize(actuals_arr,
+                                (capacity, output_count))
+            targets_arr[count] = targets
+            actuals_arr[count] = activations
             count += 1
-            eval_list.append([targets,
-                        self.output_layer.activations()])
             if show_sample_interval > 0:
                 if count % show_sample_interval == 0:
                     #   Convert to logging at some point
-                    print "sample: %s errors: %s" % (
-                        count, summed_errors)
+                    print ("sample: %s errors: %s" % (
+                        count, summed_errors))
+
+        eval_list[:] = [[sample_targets, sample_actuals]
+                            for sample_targets, sample_actuals in
+                                zip(targets_arr[:count],
+                                    actuals_arr[:count])]
+
+        if engine is not None:
+            engine.write_back()
 
         self.mse = self.calc_mse(summed_errors, count)
         return self.mse
@@ -659,6 +1458,41 @@ class NeuralNet(object):
 
         return outputs
 
+    def process_batch(self, inputs_batch):
+        """
+        This function accepts a list of input rows and feeds the whole
+        batch forward through the network as a series of matrix products,
+        returning one row of output layer activations per input row.
+
+        The inputs in each row apply sequentially to the input nodes,
+        just as with process_sample.  The batch form never touches node
+        values and never learns, so it suits evaluating a trained
+        network.  Networks with copy nodes carry values from sample to
+        sample and must use process_sample instead.
+
+        """
+
+        for layer in self.layers:
+            if layer.total_nodes(NODE_COPY) > 0:
+                raise ValueError(
+                    "Batch processing cannot be used with copy nodes")
+
+        inputs_batch = np.asarray(inputs_batch, dtype=float)
+        activations = np.ones((inputs_batch.shape[0],
+                                self.input_layer.total_nodes()))
+        column = 0
+        for position, node in enumerate(self.input_layer.nodes):
+            if node.node_type == NODE_INPUT:
+                activations[:, position] = batch_activation(
+                        node.get_activation_type())(inputs_batch[:, column])
+                column += 1
+
+        for layer_no in range(1, len(self.layers)):
+            activations = self.layers[layer_no].feed_forward_batch(
+                    self.layers[layer_no - 1], activations)
+
+        return activations
+
     def _feed_forward(self):
         """
         This function starts with the first hidden layer and
@@ -681,10 +1515,19 @@ class NeuralNet(object):
         next layer, and carries the results down through each layer back to the
         input layer.
 
+        Each layer updates its errors and adjusts its weights in one fused
+        pass on the way down.  A node's weights only feed its own error
+        share downward before they are adjusted, so the result matches the
+        two separate passes while touching each layer once.
+
         """
 
-        self._update_error(toponly=False)
-        self._adjust_weights()
+        self._zero_errors()
+        halt_on_extremes = self.get_halt_on_extremes()
+        for layer in self.layers[:0:-1]:
+            layer.backward(self._learnrate, halt_on_extremes)
+
+        self.layers[0].update_error(halt_on_extremes)
 
     def _update_error(self, toponly):
         """
@@ -698,11 +1541,12 @@ class NeuralNet(object):
         if toponly is False:
             self._zero_errors()
 
+        halt_on_extremes = self.get_halt_on_extremes()
         if toponly:
-            self.output_layer.update_error(self.get_halt_on_extremes())
+            self.output_layer.update_error(halt_on_extremes)
         else:
-            for layer_no in range(len(self.layers) - 1, -1, -1):
-                self.layers[layer_no].update_error(self.get_halt_on_extremes())
+            for layer in reversed(self.layers):
+                layer.update_error(halt_on_extremes)
 
     def _zero_errors(self):
         """
@@ -715,19 +1559,6 @@ class NeuralNet(object):
             for node in layer.nodes:
                 node.error = 0.0
 
-    def _adjust_weights(self):
-        """
-        This function goes through layers starting with the top hidden layer
-        and working its way down to the input layer.
-
-        At each layer, the weights are adjusted based upon the errors.
-
-        """
-
-        for layer_no in range(len(self.layers) - 1, 0, -1):
-            layer = self.layers[layer_no]
-            layer.adjust_weights(self._learnrate, self.get_halt_on_extremes())
-
     def calc_sample_error(self):
         """
         The mean squared error (MSE) is a measure of how well the outputs
@@ -735,11 +1566,9 @@ class NeuralNet(object):
 
         """
 
-        total = 0.0
-        for node in self.output_layer.nodes:
-            total += pow(node.error, 2.0)
+        errors = np.array([node.error for node in self.output_layer.nodes])
 
-        return total
+        return float(np.dot(errors, errors))
 
     def _copy_levels(self):
         """
@@ -817,7 +1646,7 @@ class NeuralNet(object):
         Ex.  node-1:0, 0.166366874487
         """
 
-        node_id, weight = conn_strs.split(',')
+        node_id, weight = conn_strs.rsplit(',', 1)
         weight = float(weight)
         layer_no, node_no = self._parse_node_id(node_id)
         lower_node = self.layers[layer_no].get_node(node_no)
@@ -842,10 +1671,10 @@ class NeuralNet(object):
             Returns layer_no and node_no
         """
 
-        components = [i for i in node_id.split(":")]
-        layer_no = int(components[0].split('-')[1])
-        node_no = int(components[1])
-        return (layer_no, node_no)
+        match = _NODE_ID_RE.search(node_id)
+        if match is None:
+            raise ValueError("Invalid node id: %s" % (node_id,))
+        return (int(match.group(1)), int(match.group(2)))
 
     def load(self, filename):
         """
@@ -926,71 +1755,80 @@ class NeuralNet(object):
         the layer.
         """
 
-        output = ''
+        parts = []
+        self._write_output(parts.append)
+        return ''.join(parts)
+
+    def _write_output(self, write):
+        """
+        This function writes the network configuration through the
+        received write function -- a file object's write or a list
+        append.  Accumulating pieces this way keeps serialization
+        linear in the output size, where repeated string concatenation
+        grows quadratic on larger networks.
+
+        """
+
         #   Overall parameters
-        output += '[net]\n'
+        write('[net]\n')
 
         #   Overall layer structure
-        output += 'input_neurons = %s\n' % (
-                self.input_layer.total_nodes(NODE_INPUT))
-        output += 'hidden_neurons = %s\n' % (', '.join(
-                [str(layer.total_nodes()) for layer in self.layers[1:-1]]))
-        output += 'output_neurons = %s\n' % (
-            self.output_layer.total_nodes(NODE_OUTPUT))
+        write('input_neurons = %s\n' % (
+                self.input_layer.total_nodes(NODE_INPUT)))
+        write('hidden_neurons = %s\n' % (', '.join(
+                [str(layer.total_nodes()) for layer in self.layers[1:-1]])))
+        write('output_neurons = %s\n' % (
+            self.output_layer.total_nodes(NODE_OUTPUT)))
 
         # Note: this line will change if backpropagation through time (BPTT)
         # is implemented
         if self.layers[1].total_nodes(NODE_HIDDEN) > 0:
             copy_levels = self.input_layer.total_nodes(NODE_COPY) / \
                             self.layers[1].total_nodes(NODE_HIDDEN)
-            output += 'copy_levels = %s\n' % (copy_levels)
-        output += 'learnrate = %s\n' % (self._learnrate)
-        output += 'epochs = %s\n' % (self._epochs)
-        output += 'time_delay = %s\n' % (self._time_delay)
-        output += 'halt_on_extremes = %s\n' % (self._halt_on_extremes)
-        output += 'random_constraint = %s\n' % (self._random_constraint)
-        output += '\n\n'
+            write('copy_levels = %s\n' % (copy_levels))
+        write('learnrate = %s\n' % (self._learnrate))
+        write('epochs = %s\n' % (self._epochs))
+        write('time_delay = %s\n' % (self._time_delay))
+        write('halt_on_extremes = %s\n' % (self._halt_on_extremes))
+        write('random_constraint = %s\n' % (self._random_constraint))
+        write('\n\n')
 
         # Layers
         for layer in self.layers:
-            output += '[layer %s]\n' % (layer.layer_no)
-            output += 'layer_type = %s\n' % (layer.layer_type)
+            write('[layer %s]\n' % (layer.layer_no))
+            write('layer_type = %s\n' % (layer.layer_type))
             # Nodes
-            output += 'nodes = '
-            for node in layer.nodes:
-                output += 'node-%s:%s ' % (layer.layer_no, node.node_no)
-
-            output = output[:-1] + '\n'
-            output += '\n\n'
+            write('nodes = %s\n' % (' '.join(
+                ['node-%s:%s' % (layer.layer_no, node.node_no)
+                    for node in layer.nodes])))
+            write('\n\n')
 
             for node in layer.nodes:
-                output += '[node-%s:%s]\n' % (layer.layer_no, node.node_no)
-                output += 'node_type = %s\n' % (node.node_type)
+                write('[node-%s:%s]\n' % (layer.layer_no, node.node_no))
+                write('node_type = %s\n' % (node.node_type))
 
                 if isinstance(node, CopyNode):
                     snode = node.get_source_node()
-                    output += 'source_node = %s\n' % (self._node_id(snode))
-                    output += 'source_type = %s\n' % (node.get_source_type())
-                    output += 'incoming_weight = %s\n' % (
-                                node.get_incoming_weight())
-                    output += 'existing_weight = %s\n' % (
-                                node.get_existing_weight())
-                    output += 'activation_type = %s\n' % (
-                            node.get_activation_type())
+                    write('source_node = %s\n' % (self._node_id(snode)))
+                    write('source_type = %s\n' % (node.get_source_type()))
+                    write('incoming_weight = %s\n' % (
+                                node.get_incoming_weight()))
+                    write('existing_weight = %s\n' % (
+                                node.get_existing_weight()))
+                    write('activation_type = %s\n' % (
+                            node.get_activation_type()))
                 else:
-                    output += 'activation_type = %s\n' % (
-                            node.get_activation_type())
+                    write('activation_type = %s\n' % (
+                            node.get_activation_type()))
 
                 # Connections
-                output += 'connections = \n '
+                write('connections = \n ')
                 for conn in node.input_connections:
                     lower_node = conn.lower_node
                     node_id = self._node_id(lower_node)
-                    output += '%s, %s\n ' % (node_id, conn.get_weight())
-                output += '\n'
-            output += '\n'
-
-        return output
+                    write('%s, %s\n ' % (node_id, conn.get_weight()))
+                write('\n')
+            write('\n')
 
     @staticmethod
     def _node_id(node):
@@ -1011,5 +1849,140 @@ class NeuralNet(object):
         except:
             raise ValueError("Invalid filename")
 
-        fobj.write(self.output_values())
+        self._write_output(fobj.write)
         fobj.close()
+
+    @staticmethod
+    def _npz_filename(filename):
+        """
+        This function normalizes the filename to the .npz suffix that
+        numpy's savez appends.
+
+        """
+
+        if not filename.endswith('.npz'):
+            filename += '.npz'
+        return filename
+
+    def save_npz(self, filename):
+        """
+        This function saves the network to a compressed npz file:  the
+        topology as a JSON header and all connection weights in one
+        contiguous float array.  Loading this format reads the weights
+        back in bulk rather than parsing them from strings one
+        connection at a time, which matters for large networks.  The
+        .npz suffix is appended if not already present.
+
+        """
+
+        layers_meta = []
+        weights = []
+        for layer in self.layers:
+            nodes_meta = []
+            for node in layer.nodes:
+                node_meta = {
+                    'node_no': node.node_no,
+                    'node_type': node.node_type,
+                    'activation_type': node.get_activation_type(),
+                    'connections': [
+                        [conn.lower_node.layer.layer_no,
+                            conn.lower_node.node_no]
+                        for conn in node.input_connections]}
+                weights.extend(
+                    [conn.get_weight() for conn in node.input_connections])
+                if isinstance(node, CopyNode):
+                    snode = node.get_source_node()
+                    node_meta['source_node'] = [
+                        snode.layer.layer_no, snode.node_no]
+                    node_meta['source_type'] = node.get_source_type()
+                    node_meta['incoming_weight'] = \
+                        node.get_incoming_weight()
+                    node_meta['existing_weight'] = \
+                        node.get_existing_weight()
+                nodes_meta.append(node_meta)
+            layers_meta.append({
+                'layer_no': layer.layer_no,
+                'layer_type': layer.layer_type,
+                'nodes': nodes_meta})
+
+        meta = {
+            'learnrate': self._learnrate,
+            'epochs': self._epochs,
+            'time_delay': self._time_delay,
+            'halt_on_extremes': self._halt_on_extremes,
+            'random_constraint': self._random_constraint,
+            'layers': layers_meta}
+
+        np.savez_compressed(
+            self._npz_filename(filename),
+            meta=np.array(json.dumps(meta)),
+            weights=np.array(weights))
+
+    @staticmethod
+    def _parse_npz_node(node_meta):
+        """
+        This function builds a node from its npz metadata.  As with the
+        config file loader, connections and copy sources are attached
+        later, once all of the nodes exist.
+
+        """
+
+        node_type = node_meta['node_type']
+        if node_type == NODE_BIAS:
+            node = BiasNode()
+        elif node_type == NODE_COPY:
+            node = CopyNode()
+            node._source_type = str(node_meta['source_type'])
+            node._incoming_weight = float(node_meta['incoming_weight'])
+            node._existing_weight = float(node_meta['existing_weight'])
+            node.set_activation_type(str(node_meta['activation_type']))
+        else:
+            node = Node()
+            node.set_activation_type(str(node_meta['activation_type']))
+
+        node.node_type = node_type
+
+        return node
+
+    def load_npz(self, filename):
+        """
+        This function loads a network that was saved with save_npz.  The
+        .npz suffix is appended if not already present.
+
+        """
+
+        data = np.load(self._npz_filename(filename))
+        meta = json.loads(data['meta'].item())
+        weights = data['weights']
+
+        self.set_learnrate(float(meta['learnrate']))
+        self.set_epochs(int(meta['epochs']))
+        self.set_time_delay(int(meta['time_delay']))
+        self.set_halt_on_extremes(bool(meta['halt_on_extremes']))
+        self.set_random_constraint(float(meta['random_constraint']))
+
+        self.layers = []
+        for layer_meta in meta['layers']:
+            layer = Layer(int(layer_meta['layer_no']),
+                            str(layer_meta['layer_type']))
+            for node_meta in layer_meta['nodes']:
+                layer.add_node(self._parse_npz_node(node_meta))
+            self.layers.append(layer)
+        self.input_layer = self.layers[0]
+        self.output_layer = self.layers[-1]
+
+        #   Attach connections and copy sources now that all of the
+        #   nodes exist, taking the weights in saved order.
+        weight_no = 0
+        for layer_meta in meta['layers']:
+            layer = self.layers[layer_meta['layer_no']]
+            for node, node_meta in zip(layer.nodes, layer_meta['nodes']):
+                for layer_no, node_no in node_meta['connections']:
+                    lower_node = self.layers[layer_no].get_node(node_no)
+                    node.add_input_connection(Connection(
+                        lower_node, node, float(weights[weight_no])))
+                    weight_no += 1
+                if isinstance(node, CopyNode):
+                    layer_no, node_no = node_meta['source_node']
+                    node.set_source_node(
+                        self.layers[layer_no].get_node(node_no))
@@ -55,6 +55,7 @@ class ProtoNode(object):
         self.node_no = None
         self.node_type = None
         self._value = 0.0
+        self._activated = None
         self.input_connections = []
         self._activation_type = None
         self.error = 0.0
@@ -89,11 +90,16 @@ class ProtoNode(object):
 
     def activate(self):
         """
-        This function applies the activation function to the value of the node.
+        This function applies the activation function to the value of the
+        node.  The result is cached until the value next changes, so the
+        several places that consult the activation within one training
+        step share a single computation.
 
         """
 
-        return self._activate(self._value)
+        if self._activated is None:
+            self._activated = self._activate(self._value)
+        return self._activated
 
     def error_func(self, value):
         """
@@ -156,10 +162,13 @@ class ProtoNode(object):
 
         """
 
+        #   Direct attribute access; see the note in Node.feed_forward.
+        error = self.error
         for conn in self.input_connections:
-            conn.lower_node.error += conn.get_weight() * self.error
+            lower_node = conn.lower_node
+            lower_node.error += conn._weight * error
             if halt_on_extremes:
-                if math.isnan(conn.lower_node.error):
+                if math.isnan(lower_node.error):
                     raise ValueError("Error term has become Nan.")
 
 
@@ -200,6 +209,7 @@ class Node(ProtoNode):
 
         self._set_error_func(activation_type)
         self._activation_type = activation_type
+        self._activated = None
 
     def _set_error_func(self, activation_type):
         """
@@ -224,6 +234,7 @@ class Node(ProtoNode):
         """
 
         self._value = value
+        self._activated = None
 
     def get_value(self):
         """
@@ -241,15 +252,20 @@ class Node(ProtoNode):
 
         """
 
+        #   The accessors are bypassed here; this loop runs once per
+        #   node per sample and the method-call overhead dominates it.
         sum1 = 0.0
         for conn in self.input_connections:
-            if conn.lower_node.get_value() is None:
+            lower_node = conn.lower_node
+            value = lower_node._value
+            if value is None:
                 raise ValueError("Uninitialized node %s" % (
-                            conn.lower_node.node_no))
+                            lower_node.node_no))
 
-            sum1 += conn.lower_node.activate() * conn.get_weight()
+            sum1 += lower_node.activate() * conn._weight
 
-        self.set_value(sum1)
+        self._value = sum1
+        self._activated = self._activate(sum1)
 
     def add_input_connection(self, conn):
         """
@@ -275,20 +291,18 @@ class Node(ProtoNode):
 
         """
 
+        #   Direct attribute access; see the note in Node.feed_forward.
+        #   The former read-then-set of the same float through the
+        #   accessors is gone -- the in-place adjustment is the update.
+        error = self.error
         for conn in self.input_connections:
-            conn.add_weight(self._adjust_weight(
-                                                learnrate,
-                                                conn.lower_node.activate(),
-                                                self.error))
-            #   Fix this
+            lower_node = conn.lower_node
+            conn._weight += learnrate * lower_node.activate() * error
             conn.weight_adjusted = True
-            weight = conn.get_weight()
             if halt_on_extremes:
-                if math.isnan(weight):
+                if math.isnan(conn._weight):
                     raise ValueError("Weight term has become Nan.")
 
-            conn.set_weight(weight)
-
     @staticmethod
     def _adjust_weight(learnrate, activate_value, error):
         """
@@ -362,6 +376,7 @@ class CopyNode(Node):
 
         self._value = self._value * self._existing_weight + \
                         value * self._incoming_weight
+        self._activated = None
 
     def get_source_type(self):
         """
@@ -54,6 +54,12 @@ from pyneurgen.nodes import CopyNode, Connection
 from pyneurgen.nodes import NODE_OUTPUT, NODE_HIDDEN, NODE_INPUT
 from pyneurgen.nodes import NODE_BIAS, ACTIVATION_LINEAR
 
+try:
+    xrange
+except NameError:
+    #   Python 3
+    xrange = range
+
 
 class RecurrentConfig(object):
     """
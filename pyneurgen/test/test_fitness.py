@@ -62,6 +62,18 @@ class TestFitnessList(unittest.TestCase):
         self.fitness_list._target_value = .45
         self.assertAlmostEqual(.45, self.fitness_list.get_target_value())
 
+    def test_fast_copy(self):
+
+        flist = self.fitness_list.fast_copy()
+
+        self.assertEqual(self.fitness_list, flist)
+        self.assertEqual(MAX, flist._fitness_type)
+        self.assertEqual(0.0, flist._target_value)
+
+        #   The pairs are copies, not shared references
+        flist[0][0] = 99.0
+        self.assertEqual(3.0, self.fitness_list[0][0])
+
     def test_min_value(self):
         self.assertEqual(1.0, self.fitness_list.min_value())
 
@@ -1,8 +1,7 @@
 import unittest
 
-from datetime import datetime, timedelta
-
-from pyneurgen.genotypes import Genotype, MUT_TYPE_M, MUT_TYPE_S, conv_int
+from pyneurgen.genotypes import Genotype, MUT_TYPE_M, MUT_TYPE_S, conv_int, \
+        _evaluate, _timer
 
 
 class TestGenotype(unittest.TestCase):
@@ -201,7 +200,7 @@ class TestGenotype(unittest.TestCase):
         self.g.decimal_gene = [3, 2, 5, 6]
         self.g._max_gene_length = 4
         self.g._position = (0, 0)
-        self.g.starttime = datetime.now()
+        self.g.starttime = _timer()
         self.g._max_program_length = 10000
 
         self.assertEqual("this", self.g.runtime_resolve("<test>", 'str'))
@@ -284,7 +283,7 @@ class TestGenotype(unittest.TestCase):
         """
 
         self.g._position = (0, 0)
-        self.g.starttime = datetime.now()
+        self.g.starttime = _timer()
         self.g._max_program_length = 10000
         self.g.set_bnf_variable("<value1>", [-1, 2, 0])
         self.g.set_bnf_variable("<value2>", [1, 2, 3])
@@ -381,6 +380,34 @@ class TestGenotype(unittest.TestCase):
         self.assertEqual(5, len(self.g.decimal_gene))
         self.assertEqual((1, 5), self.g._position)
 
+    def test__consume_codons(self):
+        """
+        This function tests the bulk codon fetch.  The conditions mirror
+        test__get_codon: straight consumption, refusal past the maximum
+        length without wrap, and extension while wrapping.
+
+        """
+
+        self.g.decimal_gene = [3, 34, 5, 6]
+        self.g._max_gene_length = 4
+        self.g._wrap = False
+        self.g._extend_genotype = False
+        self.g._position = (0, 0)
+
+        self.assertEqual([3, 34, 5, 6], self.g._consume_codons(4))
+        self.assertEqual((4, 4), self.g._position)
+        self.assertRaises(ValueError, self.g._consume_codons, 1)
+
+        #   wrap -- extend -- _max_gene_length > length of gene
+        self.g._wrap = True
+        self.g._extend_genotype = True
+        self.g._max_gene_length = 5
+        self.g._position = (0, 0)
+
+        self.assertEqual([3, 34, 5, 6, 3], self.g._consume_codons(5))
+        self.assertEqual(5, len(self.g.decimal_gene))
+        self.assertEqual((1, 5), self.g._position)
+
     def test__reset_gene_position(self):
         """
         This function tests whether the starting position is reset back to 0.
@@ -440,7 +467,7 @@ class TestGenotype(unittest.TestCase):
         #   intentionally incorrect position set to test reset
         self.g._position = (3, 3)
 
-        self.g.starttime = datetime.now()
+        self.g.starttime = _timer()
         self.g._max_program_length = 10000
 
         self.assertEqual(1, self.g.compute_fitness())
@@ -459,7 +486,7 @@ class TestGenotype(unittest.TestCase):
 
         #   Long running program
         self.g._fitness = -999999
-        self.g.starttime = datetime.now() - timedelta(seconds=1000)
+        self.g.starttime = _timer() - 1000
         self.g._timeouts = (1, 1)
 
         self.g.set_bnf_variable('<S>', ''.join([
@@ -591,6 +618,29 @@ class TestGenotype(unittest.TestCase):
         length = self.g._gene_length
         self.assertEqual(length * 8, self.g.get_binary_gene_length())
 
+    def test__clone_for_crossover(self):
+        """
+        Tests cloning a genotype for use as a crossover child.
+
+        """
+
+        self.g.local_bnf['<test>'] = ['1', '2']
+        clone = self.g._clone_for_crossover()
+
+        self.assertEqual(self.g.member_no, clone.member_no)
+        self.assertEqual(self.g.binary_gene, clone.binary_gene)
+        self.assertEqual(self.g.decimal_gene, clone.decimal_gene)
+        self.assertEqual(self.g.local_bnf, clone.local_bnf)
+        self.assertEqual((0, 0), clone._position)
+
+        #   The genome of the clone is independent
+        clone.decimal_gene[0] = (clone.decimal_gene[0] + 1) % 256
+        self.assertNotEqual(self.g.decimal_gene, clone.decimal_gene)
+
+        #   The local_bnf dict is independent, although values are shared
+        clone.set_bnf_variable('<test>', ['3'])
+        self.assertEqual(['1', '2'], self.g.local_bnf['<test>'])
+
     def test_single_mutate(self):
         """
         Tests a single mutation.
@@ -652,6 +702,35 @@ class TestGenotype(unittest.TestCase):
         self.g._fitness_fail = "Fitness Fail"
         self.assertEqual("Fitness Fail", self.g.get_fitness_fail())
 
+    def test__evaluate(self):
+        """
+        This function tests the worker task that evaluates one genotype and
+        returns a result tuple.  The setup mirrors test_compute_fitness.
+
+        """
+
+        self.g._fitness_fail = "-999999"
+        self.g.set_bnf_variable('<S>', ''.join([
+                                            'a = <value1>\n',
+                                            'b = <value2>\n',
+                                            'fitness = a + b\n',
+                    'self.set_bnf_variable("<fitness>", fitness)']))
+
+        self.g.set_bnf_variable('<fitness>', 0)
+        self.g.set_bnf_variable("<value1>", [-1, 2, 0])
+        self.g.set_bnf_variable("<value2>", [1, 2, 3])
+        self.g.decimal_gene = [0, 1, 5, 6]
+        self.g._max_gene_length = 4
+        self.g._timeouts = (10, 10)
+        self.g._max_program_length = 10000
+
+        member_no, fitness, program, errors = _evaluate(self.g)
+
+        self.assertEqual(1, member_no)
+        self.assertEqual(1, fitness)
+        self.assertEqual('a = -1\nb = 2\n', program[:13])
+        self.assertEqual([], errors)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -262,6 +262,81 @@ class TestGrammaticalEvolution(unittest.TestCase):
 
         self.assertEqual(result_bnf, self.ges.get_bnf())
 
+    def test_set_parallel(self):
+        """
+        This function tests setting the parallel processing flag.
+
+        """
+
+        self.ges.set_parallel(True)
+        self.assertEqual(True, self.ges._parallel)
+
+        self.ges.set_parallel(False)
+        self.assertEqual(False, self.ges._parallel)
+
+        self.assertRaises(ValueError, self.ges.set_parallel, 'nottrue')
+
+    def test_get_parallel(self):
+        """
+        This function tests getting the parallel processing flag.
+
+        """
+
+        self.ges._parallel = True
+        self.assertEqual(True, self.ges.get_parallel())
+
+        self.ges._parallel = False
+        self.assertEqual(False, self.ges.get_parallel())
+
+    def test_set_max_workers(self):
+        """
+        This function tests setting the number of worker processes.
+
+        """
+
+        self.ges.set_max_workers(4)
+        self.assertEqual(4, self.ges._max_workers)
+
+        self.ges.set_max_workers(None)
+        self.assertEqual(None, self.ges._max_workers)
+
+        self.assertRaises(ValueError, self.ges.set_max_workers, 0)
+        self.assertRaises(ValueError, self.ges.set_max_workers, -2)
+        self.assertRaises(ValueError, self.ges.set_max_workers, 'four')
+
+    def test_get_max_workers(self):
+        """
+        This function tests getting the number of worker processes.
+
+        """
+
+        self.ges._max_workers = 4
+        self.assertEqual(4, self.ges.get_max_workers())
+
+    def test_set_steady_fitness(self):
+        """
+        This function tests setting the fitness plateau stopping criteria.
+
+        """
+
+        self.ges.set_steady_fitness(5, .01)
+        self.assertEqual(5, self.ges._steady_generations)
+        self.assertAlmostEqual(.01, self.ges._steady_epsilon)
+
+        self.assertRaises(ValueError, self.ges.set_steady_fitness, 1)
+        self.assertRaises(ValueError, self.ges.set_steady_fitness, 'five')
+        self.assertRaises(ValueError, self.ges.set_steady_fitness, 5, -.1)
+
+    def test_get_steady_fitness(self):
+        """
+        This function tests getting the fitness plateau stopping criteria.
+
+        """
+
+        self.ges._steady_generations = 5
+        self.ges._steady_epsilon = .01
+        self.assertEqual((5, .01), self.ges.get_steady_fitness())
+
     def test_set_maintain_history(self):
         """
         This function tests setting the maintain fitness list history flag.
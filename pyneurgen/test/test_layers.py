@@ -2,6 +2,8 @@ import unittest
 
 from copy import deepcopy
 
+import numpy as np
+
 from pyneurgen.layers import Layer
 from pyneurgen.nodes import Node, CopyNode, BiasNode, Connection
 from pyneurgen.nodes import sigmoid, sigmoid_derivative, tanh, tanh_derivative
@@ -202,6 +204,36 @@ class TestLayer(unittest.TestCase):
             sigmoid(.25) * .25 + sigmoid(.5) * .5, node.get_value())
 
 
+    def test_feed_forward_batch(self):
+
+        layer0 = Layer(0, 'input')
+        layer0.add_nodes(2, 'input')
+        layer0.set_activation_type('sigmoid')
+        layer0.add_node(BiasNode())
+
+        layer1 = Layer(1, 'hidden')
+        layer1.add_nodes(1, 'hidden')
+        layer1.connect_layer(layer0)
+
+        node = layer1.nodes[0]
+        node.input_connections[0].set_weight(.25)
+        node.input_connections[1].set_weight(.5)
+        node.input_connections[2].set_weight(.1)
+
+        lower = np.array([
+            [sigmoid(.25), sigmoid(.5), 1.0],
+            [sigmoid(.75), sigmoid(1.0), 1.0]])
+
+        result = layer1.feed_forward_batch(layer0, lower)
+
+        self.assertEqual((2, 1), result.shape)
+        self.assertAlmostEqual(
+            sigmoid(sigmoid(.25) * .25 + sigmoid(.5) * .5 + .1),
+            result[0][0])
+        self.assertAlmostEqual(
+            sigmoid(sigmoid(.75) * .25 + sigmoid(1.0) * .5 + .1),
+            result[1][0])
+
     def test_update_error(self):
 
         pass
@@ -111,6 +111,54 @@ class TestNeuralNet(unittest.TestCase):
         self.net.set_epochs(3)
         self.assertEqual(3, self.net.get_epochs())
 
+    def test_set_batch_size(self):
+
+        self.net._batch_size = 'fail'
+        self.net.set_batch_size(3)
+        self.assertEqual(3, self.net._batch_size)
+
+        self.failUnlessRaises(ValueError, self.net.set_batch_size, .3)
+        self.failUnlessRaises(ValueError, self.net.set_batch_size, 0)
+        self.failUnlessRaises(ValueError, self.net.set_batch_size, -3)
+        self.failUnlessRaises(ValueError, self.net.set_batch_size, 'a')
+
+    def test_get_batch_size(self):
+
+        self.net.set_batch_size(3)
+        self.assertEqual(3, self.net.get_batch_size())
+
+    def test_set_max_workers(self):
+
+        self.net._max_workers = 'fail'
+        self.net.set_max_workers(3)
+        self.assertEqual(3, self.net._max_workers)
+
+        self.failUnlessRaises(ValueError, self.net.set_max_workers, .3)
+        self.failUnlessRaises(ValueError, self.net.set_max_workers, 0)
+        self.failUnlessRaises(ValueError, self.net.set_max_workers, 'a')
+
+    def test_get_max_workers(self):
+
+        self.net.set_max_workers(3)
+        self.assertEqual(3, self.net.get_max_workers())
+
+    def test_set_inference_precision(self):
+
+        self.net.set_inference_precision('single')
+        self.assertEqual('single', self.net._inference_precision)
+        self.net.set_inference_precision('double')
+        self.assertEqual('double', self.net._inference_precision)
+
+        self.failUnlessRaises(
+            ValueError, self.net.set_inference_precision, 'half')
+        self.failUnlessRaises(
+            ValueError, self.net.set_inference_precision, 32)
+
+    def test_get_inference_precision(self):
+
+        self.net.set_inference_precision('single')
+        self.assertEqual('single', self.net.get_inference_precision())
+
     def test_set_time_delay(self):
 
         self.net._time_delay = 'fail'
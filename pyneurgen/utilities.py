@@ -46,7 +46,6 @@ def base10tobase2(value, zfill=0):
     resulting in a string 1 char longer than the zfill specified.
 
     """
-    new_value = []
     val = int(value)
     if val < 0:
         neg = True
@@ -54,15 +53,7 @@ def base10tobase2(value, zfill=0):
     else:
         neg = False
 
-    if val == 0:
-        new_value = ['0']
-
-    while val > 0:
-        new_value.append(str(val % 2))
-        val = val / 2
-
-    new_value.reverse()
-    new_value_str = ''.join(new_value)
+    new_value_str = format(val, 'b')
     if zfill:
         if len(new_value_str) > zfill:
             raise ValueError("""
@@ -84,25 +75,8 @@ def base2tobase10(value):
 
     """
 
-    new_value = 0
     val = str(value)
-    if val < 0:
-        neg = True
-        val *= -1
-    else:
-        neg = False
-
-    val = str(value)
-
-    factor = 0
-    for i in range(len(val) - 1, -1, -1):
-        if not val[i] == '-':
-            new_value += int(val[i]) * pow(2, factor)
-        else:
-            neg = True
-        factor += 1
-
-    if neg:
-        new_value *= -1
+    if val.startswith('-'):
+        return -int(val[1:], 2)
 
-    return new_value
+    return int(val, 2)